@@ -1,12 +1,63 @@
 # app.py
-from flask import Flask, render_template, request, jsonify
-from deadline_manager import DocumentDeadlineManager
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+from deadline_manager import CURSOR_LENGTHS, DocumentDeadlineManager
+from deadline_store import COLUMNS
+from job_queue import JobQueue
+from metrics import METRICS
 from pathlib import Path
+import base64
+import orjson
 import os
 
 app = Flask(__name__)
+# Cheap to build: the RAG system and its connections are only created by the first analysis
 manager = DocumentDeadlineManager()
 
+def analyze_job(document_name: str, content: str) -> dict:
+    """Job handler: analyse an upload and return its stored deadline row"""
+    row = manager.process_new_document(content, document_name)
+    if row is None:
+        # process_new_document reports errors by returning None; fail the job so /jobs shows the error
+        raise RuntimeError(f"Could not analyze {document_name}; see the server log")
+    return row
+
+# Uploads are analysed by background workers; /analyze only queues them
+jobs = JobQueue(analyze_job)
+jobs.start()
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Upper bound on /analyze/batch?concurrency; stays below the async engine's 20 Postgres connections
+MAX_BATCH_CONCURRENCY = int(os.environ.get("ASSET_LAYER_MAX_BATCH_CONCURRENCY", 16))
+
+def encode_cursor(after: tuple) -> str:
+    """Opaque pagination cursor for the key of the last row on a page"""
+    return base64.urlsafe_b64encode(':'.join(str(value) for value in after).encode()).decode()
+
+def decode_cursor(cursor: str, length: int = None) -> tuple:
+    """Inverse of encode_cursor (raises ValueError on malformed cursors, or ones without length values)"""
+    if not cursor:
+        return None
+    try:
+        text = base64.urlsafe_b64decode(cursor.encode()).decode()
+        after = tuple(int(value) for value in text.split(':'))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if length is not None and len(after) != length:
+        # Cursors of 'all' pages and of upcoming/expired pages are not interchangeable
+        raise ValueError(f"Invalid cursor for this deadline type: {cursor}")
+    return after
+
+def orjson_response(payload, status: int = 200):
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+def stream_json_array(records):
+    """Serialize records as a JSON array one element at a time"""
+    yield b'['
+    for i, record in enumerate(records):
+        yield (b',' if i else b'') + orjson.dumps(record)
+    yield b']'
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -23,30 +74,104 @@ def analyze():
     # Save file temporarily
     content = file.read().decode('utf-8')
     
-    # Process document
-    manager.process_new_document(content, file.filename)
+    # Queue the document and return at once; poll /jobs/<job_id> for its row
+    job_id = jobs.submit(file.filename, content)
     
-    # Get all deadlines
-    deadlines = manager.get_all_deadlines()
+    response = orjson_response({
+        'success': True,
+        'job_id': job_id,
+        'status': 'queued'
+    }, status=202)
+    response.headers['Location'] = f"/jobs/{job_id}"
+    return response
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status of an /analyze job; 'result' holds the stored deadline row once it is done"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return orjson_response(job)
+
+@app.route('/jobs/stats')
+def job_stats():
+    return jsonify(jobs.stats())
+
+@app.route('/metrics')
+def metrics():
+    """Stage timings and pipeline counters in the Prometheus text format"""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    files = [file for file in request.files.getlist('files') if file.filename]
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
+    concurrency = request.args.get('concurrency', default=8, type=int)
+    concurrency = min(max(concurrency, 1), MAX_BATCH_CONCURRENCY)
     
-    # Convert to dictionary for JSON response
-    deadlines_dict = deadlines.to_dict('records')
+    # Read uploads up front; the request body is gone once the response starts streaming
+    documents = [(file.filename, file.read().decode('utf-8')) for file in files]
     
-    return jsonify({
-        'success': True,
-        'deadlines': deadlines_dict
-    })
+    # Stream one JSON line per document as each analysis completes
+    def generate():
+        for document_name, row in manager.process_documents(documents, concurrency=concurrency):
+            yield orjson.dumps({
+                'document_name': document_name,
+                'success': row is not None,
+                'deadline': row
+            }) + b'\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/deadlines/<deadline_type>')
 def get_deadlines(deadline_type):
-    if deadline_type == 'upcoming':
-        deadlines = manager.get_upcoming_deadlines()
-    elif deadline_type == 'expired':
-        deadlines = manager.get_expired_deadlines()
-    else:
-        deadlines = manager.get_all_deadlines()
-        
-    return jsonify(deadlines.to_dict('records'))
+    """One page of deadlines; the cursor for the next page is in the X-Next-Cursor header.
+
+    Query parameters: limit, cursor, fields (comma-separated columns),
+    document_type, days (upcoming window) and format=ndjson for NDJSON output.
+    """
+    if deadline_type not in CURSOR_LENGTHS:
+        return jsonify({'error': f"Unknown deadline type; choose from {', '.join(CURSOR_LENGTHS)}"}), 404
+    try:
+        limit = request.args.get('limit', default=DEFAULT_PAGE_SIZE, type=int)
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+        after = decode_cursor(request.args.get('cursor'), CURSOR_LENGTHS[deadline_type])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    fields = request.args.get('fields')
+    fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+    if fields and any(field not in COLUMNS for field in fields):
+        return jsonify({'error': f"Unknown field; choose from {', '.join(COLUMNS)}"}), 400
+    
+    records, next_after = manager.get_deadline_page(
+        deadline_type,
+        after=after,
+        limit=limit,
+        fields=fields,
+        document_type=request.args.get('document_type'),
+        days_threshold=request.args.get('days', default=30, type=int)
+    )
+    
+    headers = {'X-Next-Cursor': encode_cursor(next_after)} if next_after else {}
+    if request.args.get('format') == 'ndjson':
+        body = (orjson.dumps(record) + b'\n' for record in records)
+        return Response(body, mimetype='application/x-ndjson', headers=headers)
+    return Response(stream_json_array(records), mimetype='application/json', headers=headers)
+
+# Stats polling must not load the LLM stack; the RAG system starts with the first analysis
+@app.route('/cache/stats')
+def cache_stats():
+    if not manager.rag_loaded:
+        return jsonify({'rag_loaded': False})
+    return jsonify(manager.rag.get_cache_stats())
+
+@app.route('/generation/stats')
+def generation_stats():
+    if not manager.rag_loaded:
+        return jsonify({'rag_loaded': False})
+    return jsonify(manager.rag.get_generation_stats())
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
@@ -1,35 +1,69 @@
 # deadline_manager.py
 
 from datetime import datetime, timedelta
-import pandas as pd
-from rag_system import RAGSystem
+import threading
+from typing import TYPE_CHECKING
+from deadline_store import DeadlineStore, DEFAULT_REGISTRY_PATH
+from metrics import timed
+
+if TYPE_CHECKING:
+    # Deadline queries run without pandas or the LLM stack; both are imported on first use
+    import pandas as pd
+
+def empty_frame() -> 'pd.DataFrame':
+    import pandas as pd
+    return pd.DataFrame()
+
+# Common document types and their typical renewal periods, in days
+DOCUMENT_PATTERNS = {
+    'BBBEE Certificate': {'period': 365},  # Annual renewal
+    'Environmental Authorization': {'period': 730},  # Bi-annual
+    'Safety Certification': {'period': 365}  # Annual renewal
+}
+
+# Deadline page types and the length of their resume cursors (see get_deadline_page)
+CURSOR_LENGTHS = {'upcoming': 2, 'expired': 2, 'all': 1}
 
 class DocumentDeadlineManager:
-    def __init__(self):
-        """Initialize the deadline manager"""
-        # Initialize RAG system
-        self.rag = RAGSystem()
+    def __init__(self, registry_path: str = DEFAULT_REGISTRY_PATH):
+        """Initialize the deadline manager (registry_path=None keeps deadlines in memory only)"""
+        # The RAG system (async-capable, with the synchronous API as a wrapper) connects
+        # to the LLM, embedding service and database on first use; see the rag property
+        self._rag = None
+        self.rag_lock = threading.Lock()
         
         # Common document types and their typical renewal periods
-        self.document_patterns = {
-            'BBBEE Certificate': {'period': 365},  # Annual renewal
-            'Environmental Authorization': {'period': 730},  # Bi-annual
-            'Safety Certification': {'period': 365}  # Annual renewal
-        }
+        self.document_patterns = {name: dict(pattern) for name, pattern in DOCUMENT_PATTERNS.items()}
         
-        # Store document deadlines
-        self.document_deadlines = pd.DataFrame(columns=[
-            'document_id',
-            'document_name',
-            'document_type',
-            'upload_date',
-            'deadline_date',
-            'deadline_source',  # 'explicit', 'inferred', or 'unknown'
-            'confidence_level'  # 'high', 'medium', 'low'
-        ])
+        # Store document deadlines in typed, growable column buffers persisted
+        # to append-only files; the registry is only read on first use
+        self.deadline_store = DeadlineStore(registry_path)
         
-        # Initialize document counter for IDs
-        self.doc_counter = 0
+
+    @property
+    def rag(self):
+        """The RAG system, created on first use (a failed connection is retried on the next use)"""
+        if self._rag is None:
+            with self.rag_lock:
+                if self._rag is None:
+                    # Importing langchain, text_generation and SQLAlchemy alone takes seconds
+                    from async_rag_system import AsyncRAGSystem
+                    self._rag = AsyncRAGSystem()
+        return self._rag
+
+    @property
+    def rag_loaded(self) -> bool:
+        return self._rag is not None
+
+    @property
+    def doc_counter(self) -> int:
+        """Number of the last document id issued (ids are DOC_<row position + 1>)"""
+        return len(self.deadline_store)
+
+    @property
+    def document_deadlines(self) -> 'pd.DataFrame':
+        """All stored deadlines as a DataFrame, built on demand"""
+        return self.deadline_store.to_frame()
 
     def parse_date(self, date_str):
         """Parse date string to datetime object"""
@@ -68,22 +102,24 @@ class DocumentDeadlineManager:
         return 'low'
 
     def store_deadline_info(self, document_name: str, doc_info: dict, deadline_date: datetime, deadline_source: str):
-        """Store document deadline information"""
+        """Store document deadline information, returning the stored row"""
         try:
-            self.doc_counter += 1
             confidence = self.determine_confidence_level(deadline_source, doc_info)
             
-            new_row = pd.DataFrame([{
-                'document_id': f"DOC_{self.doc_counter}",
+            row = {
+                'document_id': None,
                 'document_name': document_name,
                 'document_type': doc_info.get('document_type'),
                 'upload_date': datetime.now(),
                 'deadline_date': deadline_date,
                 'deadline_source': deadline_source,
-                'confidence_level': confidence
-            }])
-            
-            self.document_deadlines = pd.concat([self.document_deadlines, new_row], ignore_index=True)
+                'confidence_level': confidence,
+                'analysis_tier': doc_info.get('analysis_tier')
+            }
+            with timed('store_append'):
+                # The id comes from the row's position, reserved under the registry's lock
+                # (threads here, processes too when shared), so it is never issued twice
+                self.deadline_store.append(row, make_id=lambda position: f"DOC_{position + 1}")
             
             # Print detailed information
             print("\nDocument Analysis Results:")
@@ -91,23 +127,48 @@ class DocumentDeadlineManager:
             print(f"Deadline Date: {deadline_date.strftime('%Y-%m-%d') if deadline_date else 'Not determined'}")
             print(f"Deadline Source: {deadline_source}")
             print(f"Confidence Level: {confidence}")
+            print(f"Analysis Tier: {doc_info.get('analysis_tier')}")
             if doc_info.get('other_dates'):
                 print("Other relevant dates found:", doc_info.get('other_dates'))
             
+            return row
+            
         except Exception as e:
             print(f"Error storing deadline info: {str(e)}")
+            return None
 
     def process_new_document(self, document_content: str, document_name: str):
-        """Process a new document and determine its deadline"""
+        """Process a new document and determine its deadline, returning the stored row"""
         try:
             print("\nAnalyzing document...")
             
             # Use RAG to analyze document
-            doc_info = self.rag.analyze_document(document_content)
+            with timed('analyze'):
+                doc_info = self.rag.analyze_document(document_content)
             
+            return self.record_analysis(document_name, doc_info)
+                
+        except Exception as e:
+            print(f"Error processing document: {str(e)}")
+            return None
+
+    def process_documents(self, documents, concurrency: int = 8):
+        """Analyse an iterable of (document_name, content) pairs with bounded concurrency.
+
+        Yields (document_name, stored_row) as each analysis completes; stored_row is
+        None when no deadline could be determined.
+        """
+        from batch_scheduler import BatchScheduler
+        scheduler = BatchScheduler(self.rag, concurrency=concurrency)
+        for document_name, doc_info in scheduler.run_sync(documents):
+            yield document_name, self.record_analysis(document_name, doc_info)
+
+    def record_analysis(self, document_name: str, doc_info: dict):
+        """Determine a document's deadline from its analysis and store it"""
+        try:
             if not doc_info:
                 print(f"Could not analyze document: {document_name}")
-                return
+                return None
             
             print("\nDocument type identified:", doc_info.get('document_type'))
             
@@ -137,7 +198,7 @@ class DocumentDeadlineManager:
             
             # Store document deadline info
             if deadline_date:
-                self.store_deadline_info(
+                return self.store_deadline_info(
                     document_name,
                     doc_info,
                     deadline_date,
@@ -145,37 +206,88 @@ class DocumentDeadlineManager:
                 )
             else:
                 print(f"Could not determine deadline for document: {document_name}")
+                return None
                 
         except Exception as e:
             print(f"Error processing document: {str(e)}")
+            return None
 
-    def get_upcoming_deadlines(self, days_threshold: int = 30):
-        """Get documents with upcoming deadlines"""
+    def get_upcoming_deadlines(self, days_threshold: int = 30, document_type: str = None):
+        """Get documents with upcoming deadlines, soonest first"""
         try:
-            if self.document_deadlines.empty:
-                return pd.DataFrame()
+            if self.deadline_store.empty:
+                return empty_frame()
                 
             current_date = datetime.now()
-            mask = (
-                (self.document_deadlines['deadline_date'] >= current_date) & 
-                (self.document_deadlines['deadline_date'] <= current_date + timedelta(days=days_threshold))
+            return self.deadline_store.deadlines_between(
+                current_date,
+                current_date + timedelta(days=days_threshold),
+                document_type
             )
-            return self.document_deadlines[mask]
         except Exception as e:
             print(f"Error getting upcoming deadlines: {str(e)}")
-            return pd.DataFrame()
+            return empty_frame()
 
-    def get_expired_deadlines(self):
-        """Get documents with expired deadlines"""
+    def get_expired_deadlines(self, document_type: str = None):
+        """Get documents with expired deadlines, oldest first"""
         try:
-            if self.document_deadlines.empty:
-                return pd.DataFrame()
+            if self.deadline_store.empty:
+                return empty_frame()
                 
             current_date = datetime.now()
-            return self.document_deadlines[self.document_deadlines['deadline_date'] < current_date]
+            return self.deadline_store.deadlines_between(
+                None, current_date, document_type, include_end=False
+            )
         except Exception as e:
             print(f"Error getting expired deadlines: {str(e)}")
-            return pd.DataFrame()
+            return empty_frame()
+
+    def get_deadlines_between(self, start_date: datetime = None, end_date: datetime = None,
+                              document_type: str = None):
+        """Get documents with deadlines in [start_date, end_date], optionally of one type"""
+        try:
+            if self.deadline_store.empty:
+                return empty_frame()
+                
+            return self.deadline_store.deadlines_between(start_date, end_date, document_type)
+        except Exception as e:
+            print(f"Error getting deadlines in range: {str(e)}")
+            return empty_frame()
+
+    def get_deadline_page(self, deadline_type: str = 'all', after: tuple = None, limit: int = 100,
+                          fields: list = None, document_type: str = None, days_threshold: int = 30):
+        """Get one page of deadline records and the cursor to resume after it.
+
+        'upcoming' and 'expired' pages are in deadline order and resume after a
+        (deadline_ns, position) cursor; 'all' is in insertion order and resumes
+        after a (position,) cursor. The returned cursor is None on the last page.
+        Raises ValueError for other types or a cursor of the wrong shape.
+        """
+        if deadline_type not in CURSOR_LENGTHS:
+            raise ValueError(f"Unknown deadline type: {deadline_type}")
+        if after is not None and len(after) != CURSOR_LENGTHS[deadline_type]:
+            raise ValueError(f"Cursor does not belong to a '{deadline_type}' page")
+        store = self.deadline_store
+        current_date = datetime.now()
+        # Fetch one extra row to learn whether another page follows
+        if deadline_type == 'upcoming':
+            positions = store.positions_between(
+                current_date, current_date + timedelta(days=days_threshold), document_type,
+                after=after, limit=limit + 1
+            )
+        elif deadline_type == 'expired':
+            positions = store.positions_between(
+                None, current_date, document_type, include_end=False, after=after, limit=limit + 1
+            )
+        else:
+            positions = store.positions_after(after[0] if after else None, limit + 1, document_type)
+        
+        next_after = None
+        if len(positions) > limit:
+            positions = positions[:limit]
+            last = int(positions[-1])
+            next_after = (last,) if deadline_type not in ('upcoming', 'expired') else store.deadline_key(last)
+        return store.records(positions, fields), next_after
 
     def get_all_deadlines(self):
         """Get all document deadlines"""
@@ -0,0 +1,177 @@
+# embedding_cache.py
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from langchain_core.embeddings import Embeddings
+from metrics import inc, timed
+
+DEFAULT_EMBEDDING_CACHE_PATH = os.environ.get("ASSET_LAYER_EMBEDDING_CACHE", ".cache/embeddings.sqlite3")
+DEFAULT_EMBEDDING_MODEL_ID = "BAAI/bge-large-en-v1.5"
+# About 200MB of SQLite at 1024 float32 dimensions; see embedding_cache_max_entries in connections.py
+DEFAULT_MAX_ENTRIES = 50_000
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different copies of a text share a cache entry"""
+    return " ".join(text.split())
+
+class EmbeddingCache:
+    """Disk-backed embedding cache keyed on model id plus text hash, with size-bounded LRU eviction"""
+
+    def __init__(self, path: str = DEFAULT_EMBEDDING_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)")
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_id: str, text: str) -> str:
+        """Build the cache key for a text embedded by a given model"""
+        return hashlib.sha256(f"{model_id}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def get_many(self, model_id: str, texts: list) -> list:
+        """Look up embeddings for texts, returning None for each miss"""
+        keys = [self.make_key(model_id, text) for text in texts]
+        found = {}
+        with self.lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self.conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        results = []
+        for key in keys:
+            blob = found.get(key)
+            if blob is None:
+                results.append(None)
+            else:
+                vector = array('f')
+                vector.frombytes(blob)
+                results.append(vector.tolist())
+        return results
+
+    def put_many(self, model_id: str, texts: list, vectors: list):
+        """Store embeddings for texts and evict the least recently used entries if over capacity"""
+        now = time.time()
+        rows = [
+            (self.make_key(model_id, text), array('f', vector).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            )
+            self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        """Trim the cache back under max_entries, dropping an extra 10% to amortize the cost"""
+        count = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        excess = count - self.max_entries + self.max_entries // 10
+        self.conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+
+    def stats(self) -> dict:
+        """Get hit/miss counters and current size"""
+        with self.lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': size}
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends cache misses to the underlying embedding service"""
+
+    def __init__(self, embeddings: Embeddings, model_id: str = DEFAULT_EMBEDDING_MODEL_ID,
+                 cache: EmbeddingCache = None):
+        self.embeddings = embeddings
+        self.model_id = model_id
+        self.cache = cache or EmbeddingCache()
+
+    def _split_misses(self, texts: list):
+        cached = self.cache.get_many(self.model_id, texts)
+        # Embed each distinct missing text once, even if it repeats within the batch
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        return cached, missing
+
+    def _merge(self, texts: list, cached: list, missing: list, vectors: list) -> list:
+        if missing:
+            self.cache.put_many(self.model_id, missing, vectors)
+        computed = dict(zip(missing, vectors))
+        return [vector if vector is not None else computed[text] for text, vector in zip(texts, cached)]
+
+    def embed_documents(self, texts: list) -> list:
+        cached, missing = self._split_misses(texts)
+        vectors = []
+        if missing:
+            # Only calls to the embedding service are timed as the embed stage
+            inc('embedded_texts_total', value=len(missing))
+            with timed('embed'):
+                vectors = self.embeddings.embed_documents(missing)
+        return self._merge(texts, cached, missing, vectors)
+
+    def embed_query(self, text: str) -> list:
+        cached = self.cache.get_many(self.model_id, [text])[0]
+        if cached is not None:
+            return cached
+        inc('embedded_texts_total')
+        with timed('embed'):
+            vector = self.embeddings.embed_query(text)
+        self.cache.put_many(self.model_id, [text], [vector])
+        return vector
+
+    # The async variants run the SQLite lookups and writes in a thread, off the event loop
+
+    async def aembed_documents(self, texts: list) -> list:
+        cached, missing = await asyncio.to_thread(self._split_misses, texts)
+        vectors = []
+        if missing:
+            inc('embedded_texts_total', value=len(missing))
+            with timed('embed'):
+                vectors = await self.embeddings.aembed_documents(missing)
+        return await asyncio.to_thread(self._merge, texts, cached, missing, vectors)
+
+    async def aembed_query(self, text: str) -> list:
+        cached = (await asyncio.to_thread(self.cache.get_many, self.model_id, [text]))[0]
+        if cached is not None:
+            return cached
+        inc('embedded_texts_total')
+        with timed('embed'):
+            vector = await self.embeddings.aembed_query(text)
+        await asyncio.to_thread(self.cache.put_many, self.model_id, [text], [vector])
+        return vector
@@ -0,0 +1,127 @@
+# fast_classifier.py
+
+import re
+import threading
+from date_extraction import date_at, extract_dates
+from deadline_store import ANALYSIS_TIERS
+from metrics import inc
+
+# Phrases that identify each document type; a document is only classified on the
+# fast path when it matches at least two phrases of one type and none of the others
+TYPE_KEYWORDS = {
+    'BBBEE Certificate': [
+        'b-bbee', 'bbbee', 'broad-based black economic empowerment', 'bee level', 'bee status',
+        'bee certificate', 'procurement recognition'
+    ],
+    'Environmental Authorization': [
+        'environmental authorization', 'environmental authorisation', 'environmental assessment',
+        'environmental management', 'nema', 'environmental impact'
+    ],
+    'Safety Certification': [
+        'safety certificate', 'safety certification', 'occupational health and safety',
+        'safety management', 'ohs act', 'fire safety', 'safety inspection'
+    ]
+}
+MIN_TYPE_KEYWORDS = 2
+
+# A label followed directly by a date, e.g. "Expiry Date: January 14, 2025"
+_LABEL_GAP = r'\s*[:\-]?\s*'
+EXPIRY_LABEL = re.compile(
+    r'(?:expiry date|expiration date|date of expiry|expires(?: on)?|valid until|valid till'
+    r'|valid to|valid through)' + _LABEL_GAP,
+    re.IGNORECASE
+)
+ISSUE_LABEL = re.compile(
+    r'(?:issue date|date of issue|issued on|date issued)' + _LABEL_GAP,
+    re.IGNORECASE
+)
+
+def _keyword_counts(text: str) -> dict:
+    text = text.lower()
+    return {
+        document_type: sum(1 for keyword in keywords if keyword in text)
+        for document_type, keywords in TYPE_KEYWORDS.items()
+    }
+
+def classify_type(text: str) -> str:
+    """Get the document type if exactly one type's keywords are present (at least MIN_TYPE_KEYWORDS of them)"""
+    matched = _keyword_counts(text)
+    found = [document_type for document_type, count in matched.items() if count]
+    if len(found) == 1 and matched[found[0]] >= MIN_TYPE_KEYWORDS:
+        return found[0]
+    return None
+
+def guess_type(text: str) -> str:
+    """Looser classify_type for partitioning retrieval: the type with the most keyword matches, unless tied"""
+    matched = _keyword_counts(text)
+    best = max(matched.values())
+    found = [document_type for document_type, count in matched.items() if count == best]
+    if best and len(found) == 1:
+        return found[0]
+    return None
+
+def labelled_dates(text: str, label) -> list:
+    """Unique dates that directly follow a label, in order of appearance"""
+    dates = {}
+    for match in label.finditer(text):
+        date = date_at(text, match.end())
+        if date:
+            dates[date] = None
+    return list(dates)
+
+def fast_analysis(text: str) -> dict:
+    """Analyse a document without retrieval or the LLM, or return None if it is ambiguous.
+
+    Succeeds only for documents of one clearly identified type with exactly one
+    expiry label, followed by a readable date; everything else needs the RAG + LLM
+    pipeline.
+    """
+    document_type = classify_type(text)
+    if document_type is None:
+        return None
+    # Labels are counted rather than parsed dates, so a second expiry in a format
+    # date_at cannot read still makes the document ambiguous
+    labels = list(EXPIRY_LABEL.finditer(text))
+    if len(labels) != 1:
+        return None
+    explicit_deadline = date_at(text, labels[0].end())
+    if explicit_deadline is None:
+        return None
+
+    issue_dates = labelled_dates(text, ISSUE_LABEL)
+    document_date = issue_dates[0] if len(issue_dates) == 1 else None
+    return {
+        "document_type": document_type,
+        "explicit_deadline": explicit_deadline,
+        "document_date": document_date,
+        "other_dates": [
+            date for date in extract_dates(text) if date not in (explicit_deadline, document_date)
+        ],
+        "analysis_tier": "fast"
+    }
+
+class TierStats:
+    """Thread-safe count of analyses per tier"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {tier: 0 for tier in ANALYSIS_TIERS}
+
+    def record(self, result: dict):
+        tier = (result or {}).get('analysis_tier')
+        if tier in self.counts:
+            with self.lock:
+                self.counts[tier] += 1
+            inc('analyses_total', {'tier': tier})
+
+    def stats(self) -> dict:
+        """Get per-tier counts and the share of documents analysed without an LLM call"""
+        with self.lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        without_llm = counts['fast'] + counts['cache']
+        return {
+            **counts,
+            'total': total,
+            'without_llm_share': without_llm / total if total else 0.0
+        }
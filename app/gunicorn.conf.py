@@ -0,0 +1,39 @@
+# gunicorn.conf.py
+"""Multi-process deployment of the web app.
+
+Every worker process shares the deadline registry (append-only column files
+with cross-process file locks) and the SQLite job queue, so uploads are
+analysed in parallel across cores and any worker returns the same /deadlines
+results. Run from app/:
+    gunicorn -c gunicorn.conf.py app:app
+
+ASSET_LAYER_WEB_WORKERS (default: one per core), ASSET_LAYER_JOB_WORKERS
+(analysis threads per worker, default 2 here) and ASSET_LAYER_BIND
+(default 0.0.0.0:5000) tune it.
+"""
+
+import multiprocessing
+import os
+
+# Read by deadline_store and job_queue when each worker imports the app
+os.environ["ASSET_LAYER_SHARED_REGISTRY"] = "1"
+# Keep the total number of concurrent analyses near what one TGI server batches well
+os.environ.setdefault("ASSET_LAYER_JOB_WORKERS", "2")
+
+bind = os.environ.get("ASSET_LAYER_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("ASSET_LAYER_WEB_WORKERS", multiprocessing.cpu_count()))
+# Request threads per worker; analyses run on the job queue's threads, not these
+threads = 4
+# Each worker builds its own connection pools, LLM clients and job threads after
+# the fork; the app is cheap to import since the RAG system starts on first use
+preload_app = False
+# Uploads are queued, so requests are short; this only bounds stuck ones
+timeout = 60
+graceful_timeout = 30
+
+def worker_exit(server, worker):
+    # Let running analyses finish; queued jobs stay queued for the other workers
+    import sys
+    app_module = sys.modules.get('app')
+    if app_module is not None and hasattr(app_module, 'jobs'):
+        app_module.jobs.stop(timeout=graceful_timeout)
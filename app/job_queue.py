@@ -0,0 +1,209 @@
+# job_queue.py
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+import orjson
+
+DEFAULT_JOB_QUEUE_PATH = os.environ.get("ASSET_LAYER_JOB_QUEUE", ".cache/jobs.sqlite3")
+DEFAULT_JOB_WORKERS = int(os.environ.get("ASSET_LAYER_JOB_WORKERS", "4"))
+DEFAULT_RETENTION_SECONDS = 7 * 24 * 3600
+# Workers also poll, so jobs submitted by another process are picked up
+POLL_SECONDS = 1.0
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+def process_alive(pid: int) -> bool:
+    """Whether a process with this id is running on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        return True
+    return True
+
+class JobQueue:
+    """Persistent FIFO of analysis jobs in SQLite, processed by a pool of worker threads.
+
+    submit() stores the upload and returns a job id straight away; workers call
+    handler(document_name, content) and store its result. Jobs that were queued
+    or running when the process stopped are run again on the next start().
+    Finished jobs are kept for retention_seconds so their status can be polled.
+
+    Several processes (e.g. gunicorn workers) can share one queue file: a job is
+    claimed with a conditional update, so exactly one worker runs it, and start()
+    only requeues running jobs whose process is gone.
+    """
+
+    def __init__(self, handler, path: str = DEFAULT_JOB_QUEUE_PATH, workers: int = DEFAULT_JOB_WORKERS,
+                 retention_seconds: float = DEFAULT_RETENTION_SECONDS):
+        self.handler = handler
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.stopping = False
+        self.threads = []
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                document_name TEXT NOT NULL,
+                content TEXT,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                worker_pid INTEGER
+            )
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        if 'worker_pid' not in columns:
+            # Queues created before jobs recorded the process running them
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN worker_pid INTEGER")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_created_at ON jobs (status, created_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_finished_at ON jobs (finished_at)")
+        self.conn.commit()
+
+    def start(self):
+        """Requeue jobs interrupted by a restart and start the worker threads"""
+        with self.lock:
+            if self.threads:
+                return
+            running = self.conn.execute("SELECT id, worker_pid FROM jobs WHERE status = 'running'").fetchall()
+            requeued = 0
+            for job_id, worker_pid in running:
+                # Jobs of live processes sharing the queue are left to them
+                if worker_pid is None or not process_alive(worker_pid):
+                    requeued += self.conn.execute(
+                        "UPDATE jobs SET status = 'queued', started_at = NULL, worker_pid = NULL "
+                        "WHERE id = ? AND status = 'running'", (job_id,)
+                    ).rowcount
+            self.conn.commit()
+            if requeued:
+                print(f"Requeued {requeued} interrupted jobs")
+            self.stopping = False
+            self.threads = [
+                threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, timeout: float = None):
+        """Let running jobs finish and stop the workers; queued jobs stay queued"""
+        with self.lock:
+            self.stopping = True
+            self.wakeup.notify_all()
+            threads, self.threads = self.threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def submit(self, document_name: str, content: str) -> str:
+        """Queue a document for analysis, returning its job id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO jobs (id, document_name, content, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, document_name, content, now)
+            )
+            self.conn.execute(
+                "DELETE FROM jobs WHERE finished_at < ?", (now - self.retention_seconds,)
+            )
+            self.conn.commit()
+            self.wakeup.notify()
+        return job_id
+
+    def get(self, job_id: str) -> dict:
+        """Get a job's status, timings and result (queue position while queued), or None if unknown"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id, document_name, status, result, error, attempts, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = {
+                'job_id': row[0],
+                'document_name': row[1],
+                'status': row[2],
+                'result': orjson.loads(row[3]) if row[3] is not None else None,
+                'error': row[4],
+                'attempts': row[5],
+                'created_at': row[6],
+                'started_at': row[7],
+                'finished_at': row[8]
+            }
+            if job['status'] == 'queued':
+                job['position'] = self.conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (row[6],)
+                ).fetchone()[0]
+        end = job['finished_at'] or time.time()
+        job['queued_seconds'] = (job['started_at'] or end) - job['created_at']
+        job['run_seconds'] = end - job['started_at'] if job['started_at'] else 0.0
+        return job
+
+    def _claim(self) -> tuple:
+        """Mark the oldest queued job as running and return (id, document_name, content), or None"""
+        while True:
+            row = self.conn.execute(
+                "SELECT id, document_name, content FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            # Only succeeds if no other process claimed the job since the SELECT
+            claimed = self.conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, attempts = attempts + 1, worker_pid = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), os.getpid(), row[0])
+            ).rowcount
+            self.conn.commit()
+            if claimed:
+                return row
+
+    def _finish(self, job_id: str, status: str, result=None, error: str = None):
+        # The upload itself is no longer needed once the job is finished
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, content = NULL WHERE id = ?",
+                (status, orjson.dumps(result).decode() if result is not None else None, error, time.time(), job_id)
+            )
+            self.conn.commit()
+
+    def _work(self):
+        while True:
+            with self.lock:
+                job = None
+                while not self.stopping:
+                    job = self._claim()
+                    if job is not None:
+                        break
+                    self.wakeup.wait(POLL_SECONDS)
+                if job is None:
+                    return
+            job_id, document_name, content = job
+            try:
+                result = self.handler(document_name, content)
+                self._finish(job_id, 'done', result=result)
+            except Exception as e:
+                print(f"Error running job {job_id} ({document_name}): {str(e)}")
+                self._finish(job_id, 'failed', error=str(e))
+
+    def stats(self) -> dict:
+        """Get the number of jobs in each status"""
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in JOB_STATUSES}
@@ -0,0 +1,183 @@
+# metrics.py
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+METRIC_PREFIX = "asset_layer"
+# Upper bounds in seconds; stages range from sub-millisecond parsing to multi-second LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Pipeline stages timed with timed(); listed here so the summary prints them in order
+STAGES = (
+    'analyze', 'embed', 'vector_search', 'prompt_build', 'llm_generate', 'json_parse',
+    'fallback', 'store_append', 'load_insert'
+)
+
+def _label_text(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+class Histogram:
+    """Cumulative-bucket histogram with sum, count and max"""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the max for the overflow bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+class Metrics:
+    """Thread-safe process-wide counters and histograms, rendered in Prometheus text format"""
+
+    def __init__(self, prefix: str = METRIC_PREFIX):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted((labels or {}).items()))
+
+    def describe(self, name: str, text: str):
+        self.help[name] = text
+
+    def inc(self, name: str, labels: dict = None, value: float = 1):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: dict = None):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Time a block as one observation of stage_seconds{stage}; exceptions also count in stage_errors_total"""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc('stage_errors_total', {'stage': stage})
+            raise
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - started, {'stage': stage})
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(
+                (key, list(h.counts), h.sum, h.count, h.buckets) for key, h in self.histograms.items()
+            )
+        lines = []
+        declared = set()
+
+        def declare(name: str, kind: str):
+            if name not in declared:
+                declared.add(name)
+                full_name = f"{self.prefix}_{name}"
+                if name in self.help:
+                    lines.append(f"# HELP {full_name} {self.help[name]}")
+                lines.append(f"# TYPE {full_name} {kind}")
+
+        for (name, labels), value in counters:
+            declare(name, 'counter')
+            lines.append(f"{self.prefix}_{name}{_label_text(labels)} {value}")
+        for (name, labels), counts, total, count, buckets in histograms:
+            declare(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip((*buckets, '+Inf'), counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.prefix}_{name}_bucket{_label_text((*labels, ('le', bound)))} {cumulative}"
+                )
+            lines.append(f"{self.prefix}_{name}_sum{_label_text(labels)} {total}")
+            lines.append(f"{self.prefix}_{name}_count{_label_text(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def stage_summary(self) -> dict:
+        """Per-stage count, errors, total and mean/p50/p99/max seconds"""
+        with self.lock:
+            timings = {
+                dict(labels)['stage']: histogram for (name, labels), histogram in self.histograms.items()
+                if name == 'stage_seconds'
+            }
+            errors = {
+                dict(labels)['stage']: value for (name, labels), value in self.counters.items()
+                if name == 'stage_errors_total'
+            }
+            order = [stage for stage in STAGES if stage in timings] + sorted(set(timings) - set(STAGES))
+            return {
+                stage: {
+                    'count': timings[stage].count,
+                    'errors': errors.get(stage, 0),
+                    'total_seconds': timings[stage].sum,
+                    'mean_seconds': timings[stage].sum / timings[stage].count,
+                    'p50_seconds': timings[stage].quantile(0.5),
+                    'p99_seconds': timings[stage].quantile(0.99),
+                    'max_seconds': timings[stage].max
+                }
+                for stage in order
+            }
+
+    def format_summary(self) -> str:
+        """Stage timings as a text table for the CLI"""
+        summary = self.stage_summary()
+        if not summary:
+            return "No stages timed yet"
+        lines = [f"{'stage':<14}{'count':>8}{'errors':>8}{'total s':>10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for stage, s in summary.items():
+            lines.append(
+                f"{stage:<14}{s['count']:>8}{s['errors']:>8}{s['total_seconds']:>10.2f}"
+                f"{s['mean_seconds'] * 1000:>10.1f}{s['p50_seconds'] * 1000:>10.1f}"
+                f"{s['p99_seconds'] * 1000:>10.1f}{s['max_seconds'] * 1000:>10.1f}"
+            )
+        return "\n".join(lines)
+
+METRICS = Metrics()
+METRICS.describe('stage_seconds', "Wall time per pipeline stage (p50/p99 are bucket upper bounds)")
+METRICS.describe('stage_errors_total', "Stage executions that raised")
+METRICS.describe('llm_attempts_total', "LLM generation attempts by parse outcome")
+METRICS.describe('llm_retries_total', "LLM generation attempts after the first for a request")
+METRICS.describe('analyses_total', "Completed document analyses by tier")
+METRICS.describe('embedded_texts_total', "Texts sent to the embedding service (embedding cache misses)")
+
+def timed(stage: str):
+    """Time a block under the process-wide metrics"""
+    return METRICS.timed(stage)
+
+def inc(name: str, labels: dict = None, value: float = 1):
+    METRICS.inc(name, labels, value)
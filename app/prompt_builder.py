@@ -0,0 +1,150 @@
+# prompt_builder.py
+
+import json
+import math
+import os
+import re
+from date_extraction import DATE_SCANNER
+
+DEFAULT_PROMPT_TOKENS = int(os.environ.get("ASSET_LAYER_PROMPT_TOKENS", "2048"))
+# Share of the budget reserved for the uploaded document; the rest (plus whatever the
+# document leaves unused) goes to the retrieved reference documents
+DEFAULT_DOCUMENT_SHARE = 0.75
+DEFAULT_PASSAGE_CHARS = 800
+# TEI embeds at most 512 tokens; the head of a document is what identifies its type
+DEFAULT_QUERY_TOKENS = 384
+
+# Phrases that mark the passages of a document carrying its deadlines
+DEADLINE_KEYWORDS = [
+    'expir', 'valid', 'deadline', 'renew', 'until', 'due', 'issue', 'effective',
+    'commence', 'period', 'phase', 'review', 'audit', 'submit'
+]
+_KEYWORD_PATTERN = re.compile('|'.join(DEADLINE_KEYWORDS), re.IGNORECASE)
+
+# Rough stand-in for a Llama/Mistral tokenizer: long words split into 6-letter
+# pieces, every digit and punctuation mark is a token of its own
+_TOKEN_PATTERN = re.compile(r'[A-Za-z]{1,6}|\d|[^\sA-Za-z\d]')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in text"""
+    return sum(1 for _ in _TOKEN_PATTERN.finditer(text))
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text after its first max_tokens estimated tokens"""
+    if max_tokens <= 0:
+        return ""
+    for count, match in enumerate(_TOKEN_PATTERN.finditer(text), start=1):
+        if count == max_tokens:
+            return text[:match.end()]
+    return text
+
+def split_passages(text: str, max_chars: int = DEFAULT_PASSAGE_CHARS) -> list:
+    """Split text into paragraphs, breaking long ones at line boundaries"""
+    passages = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind('\n', 0, max_chars)
+            if cut <= 0:
+                cut = paragraph.rfind(' ', 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            passages.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if paragraph:
+            passages.append(paragraph)
+    return passages
+
+def passage_relevance(passage: str) -> int:
+    """Score a passage by the dates and deadline language it contains"""
+    dates = sum(1 for _ in DATE_SCANNER.finditer(passage))
+    keywords = sum(1 for _ in _KEYWORD_PATTERN.finditer(passage))
+    return 3 * dates + keywords
+
+def _longest_instance(schema: dict):
+    """Build the longest JSON value a (simple) JSON schema allows"""
+    if 'anyOf' in schema:
+        return max((_longest_instance(option) for option in schema['anyOf']),
+                   key=lambda value: len(json.dumps(value)))
+    if 'enum' in schema:
+        return max(schema['enum'], key=lambda value: len(json.dumps(value)))
+    kind = schema.get('type')
+    if kind == 'object':
+        return {key: _longest_instance(value) for key, value in schema.get('properties', {}).items()}
+    if kind == 'array':
+        return [_longest_instance(schema.get('items', {}))] * schema.get('maxItems', 1)
+    if kind == 'string':
+        # Date-like patterns are the only unbounded strings the analysis schema uses
+        return "0000-00-00" if 'pattern' in schema else "x" * schema.get('maxLength', 32)
+    if kind == 'null':
+        return None
+    return 0
+
+def max_output_tokens(schema: dict) -> int:
+    """max_new_tokens for an answer constrained to schema, with headroom for whitespace"""
+    tokens = estimate_tokens(json.dumps(_longest_instance(schema), indent=1))
+    return math.ceil(tokens * 1.25) + 16
+
+class PromptBuilder:
+    """Fits the uploaded document and the retrieved reference documents into a token budget.
+
+    The document's passages are ranked by passage_relevance and the best ones kept
+    (in their original order); reference documents are kept in retrieval order,
+    each trimmed to an even share of what is left.
+    """
+
+    def __init__(self, max_prompt_tokens: int = DEFAULT_PROMPT_TOKENS,
+                 document_share: float = DEFAULT_DOCUMENT_SHARE,
+                 passage_chars: int = DEFAULT_PASSAGE_CHARS, query_tokens: int = DEFAULT_QUERY_TOKENS):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.document_share = document_share
+        self.passage_chars = passage_chars
+        self.query_tokens = query_tokens
+
+    def fit_query(self, content: str) -> str:
+        """Trim a document to the part embedded for similarity search"""
+        return truncate_to_tokens(content, self.query_tokens)
+
+    def fit_document(self, content: str, budget: int) -> str:
+        """Keep the most relevant passages of a document within budget tokens"""
+        if estimate_tokens(content) <= budget:
+            return content
+        passages = split_passages(content, self.passage_chars)
+        # The opening passage names the certificate, so it always competes first
+        ranked = sorted(
+            range(len(passages)),
+            key=lambda i: (i != 0, -passage_relevance(passages[i]), i)
+        )
+        kept = {}
+        remaining = budget
+        for i in ranked:
+            tokens = estimate_tokens(passages[i]) + 1
+            if tokens <= remaining:
+                kept[i] = passages[i]
+                remaining -= tokens
+            elif not kept:
+                kept[i] = truncate_to_tokens(passages[i], remaining)
+                remaining = 0
+            if remaining <= 0:
+                break
+        return "\n\n".join(kept[i] for i in sorted(kept))
+
+    def fit_references(self, similar_docs: list, budget: int) -> str:
+        """Join retrieved documents in retrieval order, trimming each to fit budget tokens"""
+        parts = []
+        remaining = budget
+        for i, doc in enumerate(similar_docs):
+            share = remaining // (len(similar_docs) - i)
+            text = truncate_to_tokens(doc.page_content, share)
+            if text:
+                parts.append(text)
+                remaining -= estimate_tokens(text) + 1
+        return "\n".join(parts)
+
+    def fit(self, content: str, similar_docs: list, overhead: int) -> tuple:
+        """Trim (content, reference context) so the prompt, including overhead tokens, fits the budget"""
+        available = max(0, self.max_prompt_tokens - overhead)
+        document = self.fit_document(content, int(available * self.document_share))
+        reference = self.fit_references(similar_docs, available - estimate_tokens(document))
+        return document, reference
@@ -0,0 +1,105 @@
+# result_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_RESULT_CACHE_PATH = os.environ.get("ASSET_LAYER_RESULT_CACHE", ".cache/analysis_results.sqlite3")
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50_000
+
+def normalize_content(content: str) -> str:
+    """Normalize document content so re-uploads differing only in whitespace or case share a key"""
+    return " ".join(content.split()).lower()
+
+def context_id(doc) -> str:
+    """Stable id for a retrieved context document"""
+    source = (doc.metadata or {}).get('source', '')
+    return hashlib.sha256(f"{source}\0{doc.page_content}".encode('utf-8')).hexdigest()[:16]
+
+class AnalysisCache:
+    """Persistent cache of analyze_document results with TTL and size-bounded LRU eviction"""
+
+    def __init__(self, path: str = DEFAULT_RESULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_results_last_used ON results (last_used)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_results_created_at ON results (created_at)")
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(content: str, context_ids: list, prompt_version: str) -> str:
+        """Build the cache key from normalized content, retrieved context ids and prompt version"""
+        payload = "\0".join([prompt_version, normalize_content(content), *sorted(context_ids)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> dict:
+        """Get a cached result, or None if missing or expired"""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT result, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self.conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self.conn.commit()
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, result: dict):
+        """Store a result, dropping expired entries and the least recently used ones if over capacity"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), now, now)
+            )
+            self.conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl_seconds,))
+            count = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if count > self.max_entries:
+                # Drop an extra 10% so eviction isn't paid on every insert
+                excess = count - self.max_entries + self.max_entries // 10
+                self.conn.execute(
+                    "DELETE FROM results WHERE key IN "
+                    "(SELECT key FROM results ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+            self.conn.commit()
+
+    def stats(self) -> dict:
+        """Get hit/miss counters and current size"""
+        with self.lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': size
+        }
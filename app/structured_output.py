@@ -0,0 +1,167 @@
+# structured_output.py
+
+import threading
+from text_generation.types import Grammar, GrammarType
+from deadline_store import DOCUMENT_TYPES
+
+_DATE = {"type": "string", "pattern": "^[0-9]{4}-[0-9]{2}-[0-9]{2}$"}
+_OPTIONAL_DATE = {"anyOf": [_DATE, {"type": "null"}]}
+
+# JSON schema of the analysis the LLM is asked for (see RAGSystem.build_prompt)
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "document_type": {"type": "string", "enum": DOCUMENT_TYPES},
+        "explicit_deadline": _OPTIONAL_DATE,
+        "document_date": _OPTIONAL_DATE,
+        "other_dates": {"type": "array", "items": _DATE, "maxItems": 16}
+    },
+    "required": ["document_type", "explicit_deadline", "document_date", "other_dates"],
+    "additionalProperties": False
+}
+
+# Grammar parameter for TGI's constrained decoding
+ANALYSIS_GRAMMAR = Grammar(type=GrammarType.Json, value=ANALYSIS_SCHEMA)
+
+class JsonObjectParser:
+    """Incremental scanner that detects when the first top-level JSON object is closed.
+
+    Feed it generated text piece by piece; feed() returns True as soon as the
+    object's closing brace has been seen, so generation can be stopped there.
+    Text before the opening brace is skipped and text after the closing brace is
+    never kept.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.complete = False
+
+    def feed(self, text: str) -> bool:
+        """Consume a piece of generated text, returning True once the object is complete"""
+        if self.complete:
+            return True
+        start = 0
+        if self.depth == 0:
+            # Still looking for the opening brace
+            start = text.find('{')
+            if start < 0:
+                return False
+        for i in range(start, len(text)):
+            char = text[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == '{' or char == '[':
+                self.depth += 1
+            elif char == '}' or char == ']':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.parts.append(text[start:i + 1])
+                    self.complete = True
+                    return True
+        self.parts.append(text[start:])
+        return False
+
+    @property
+    def text(self) -> str:
+        """The object text seen so far"""
+        return ''.join(self.parts)
+
+class GenerationStats:
+    """Thread-safe counters for LLM generation attempts, retries and wasted tokens"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.attempts = 0
+        self.retries = 0
+        self.parse_failures = 0
+        self.fallbacks = 0
+        self.stopped_early = 0
+        self.tokens_generated = 0
+        self.tokens_wasted = 0
+        # Per-answer totals and worst cases
+        self.answers = 0
+        self.prompt_tokens = 0
+        self.max_prompt_tokens = 0
+        self.max_tokens_out = 0
+        self.answer_seconds = 0.0
+        self.max_answer_seconds = 0.0
+        # Map-reduce analysis of long documents
+        self.chunked_documents = 0
+        self.chunks_analysed = 0
+        self.chunks_skipped = 0
+
+    def record_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def record_attempt(self, tokens: int, parsed: bool, stopped_early: bool, retry: bool):
+        """Record one generation attempt; tokens of attempts that failed to parse count as wasted"""
+        with self.lock:
+            self.attempts += 1
+            if retry:
+                self.retries += 1
+            self.tokens_generated += tokens
+            if stopped_early:
+                self.stopped_early += 1
+            if not parsed:
+                self.parse_failures += 1
+                self.tokens_wasted += tokens
+
+    def record_answer(self, prompt_tokens: int, tokens_out: int, seconds: float):
+        """Record the prompt size, tokens generated over all attempts and time-to-answer of one document"""
+        with self.lock:
+            self.answers += 1
+            self.prompt_tokens += prompt_tokens
+            self.max_prompt_tokens = max(self.max_prompt_tokens, prompt_tokens)
+            self.max_tokens_out = max(self.max_tokens_out, tokens_out)
+            self.answer_seconds += seconds
+            self.max_answer_seconds = max(self.max_answer_seconds, seconds)
+
+    def record_chunks(self, analysed: int, skipped: int):
+        """Record a long document split into chunks, some skipped by the pre-filter"""
+        with self.lock:
+            self.chunked_documents += 1
+            self.chunks_analysed += analysed
+            self.chunks_skipped += skipped
+
+    def record_fallback(self):
+        with self.lock:
+            self.fallbacks += 1
+
+    def stats(self) -> dict:
+        """Get the counters plus per-request averages"""
+        with self.lock:
+            requests = self.requests
+            answers = self.answers
+            return {
+                'requests': requests,
+                'attempts': self.attempts,
+                'retries': self.retries,
+                'parse_failures': self.parse_failures,
+                'fallbacks': self.fallbacks,
+                'stopped_early': self.stopped_early,
+                'tokens_generated': self.tokens_generated,
+                'tokens_wasted': self.tokens_wasted,
+                'retries_per_request': self.retries / requests if requests else 0.0,
+                'wasted_tokens_per_request': self.tokens_wasted / requests if requests else 0.0,
+                'avg_prompt_tokens': self.prompt_tokens / answers if answers else 0.0,
+                'max_prompt_tokens': self.max_prompt_tokens,
+                'avg_tokens_out': self.tokens_generated / answers if answers else 0.0,
+                'max_tokens_out': self.max_tokens_out,
+                'avg_answer_seconds': self.answer_seconds / answers if answers else 0.0,
+                'max_answer_seconds': self.max_answer_seconds,
+                'chunked_documents': self.chunked_documents,
+                'chunks_analysed': self.chunks_analysed,
+                'chunks_skipped': self.chunks_skipped
+            }
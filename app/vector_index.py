@@ -0,0 +1,154 @@
+# vector_index.py
+
+import math
+from sqlalchemy import event, text
+
+EMBEDDING_TABLE = "langchain_pg_embedding"
+INDEX_METHODS = ('hnsw', 'ivfflat')
+# Metadata keys retrieval filters on (see RAGSystem.retrieval_filter)
+FILTER_KEYS = ('document_type',)
+
+def index_name(method: str) -> str:
+    return f"ix_{EMBEDDING_TABLE}_embedding_{method}"
+
+def ivfflat_lists(rows: int) -> int:
+    """pgvector's recommended list count: rows / 1000 up to 1M rows, sqrt(rows) beyond"""
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+def _index_exists(conn, name: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {'name': name}).scalar()
+
+def fix_dimension(conn) -> int:
+    """Give the embedding column a fixed dimension (ANN indexes need one), returning it.
+
+    langchain creates the column as an untyped vector; it is altered in place once
+    all stored embeddings share a dimension. Returns None while the table is empty.
+    """
+    typmod = conn.execute(text(
+        "SELECT atttypmod FROM pg_attribute "
+        "WHERE attrelid = CAST(:table AS regclass) AND attname = 'embedding'"
+    ), {'table': EMBEDDING_TABLE}).scalar()
+    if typmod is not None and typmod > 0:
+        return typmod
+
+    dimensions = conn.execute(text(
+        f"SELECT DISTINCT vector_dims(embedding) FROM {EMBEDDING_TABLE} WHERE embedding IS NOT NULL"
+    )).scalars().all()
+    if not dimensions:
+        return None
+    if len(dimensions) > 1:
+        raise ValueError(f"Embeddings of different dimensions {dimensions} cannot share an index")
+    dimension = int(dimensions[0])
+    conn.execute(text(f"ALTER TABLE {EMBEDDING_TABLE} ALTER COLUMN embedding TYPE vector({dimension})"))
+    return dimension
+
+def _create_index_sql(name: str, method: str, settings: dict, rows: int) -> str:
+    if method == 'hnsw':
+        options = f"m = {int(settings['hnsw_m'])}, ef_construction = {int(settings['hnsw_ef_construction'])}"
+    else:
+        lists = int(settings['ivfflat_lists']) or ivfflat_lists(rows)
+        options = f"lists = {lists}"
+    return (
+        f"CREATE INDEX CONCURRENTLY {name} ON {EMBEDDING_TABLE} "
+        f"USING {method} (embedding vector_cosine_ops) WITH ({options})"
+    )
+
+def create_index(engine, settings: dict, rebuild: bool = False) -> str:
+    """Create (or with rebuild=True, rebuild) the ANN index on the embeddings, returning its name.
+
+    The index covers the whole table with the cosine operator class, which is what
+    PGVector.similarity_search and the async similarity query order by. Indexes are
+    built CONCURRENTLY and swapped in by rename, so searches keep working during a
+    rebuild. Does nothing when settings['vector_index'] is 'none' or no embeddings
+    are stored yet.
+    """
+    method = settings['vector_index']
+    if method not in INDEX_METHODS:
+        return None
+    name = index_name(method)
+
+    with engine.begin() as conn:
+        if fix_dimension(conn) is None:
+            print("No embeddings stored yet; skipping vector index")
+            return None
+        if _index_exists(conn, name) and not rebuild:
+            return name
+        rows = conn.execute(text(f"SELECT COUNT(*) FROM {EMBEDDING_TABLE}")).scalar()
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"SET maintenance_work_mem = '{settings['index_maintenance_work_mem']}'"))
+        building = f"{name}_new"
+        # Left behind (invalid) if a previous build was interrupted
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {building}"))
+        print(f"Building {method} index over {rows} embeddings...")
+        conn.execute(text(_create_index_sql(building, method, settings, rows)))
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(f"ALTER INDEX {building} RENAME TO {name}"))
+        # Only one index method is kept
+        for other in INDEX_METHODS:
+            if other != method:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(other)}"))
+        conn.execute(text(f"ANALYZE {EMBEDDING_TABLE}"))
+    print(f"Vector index {name} ready")
+    return name
+
+def create_filter_indexes(engine):
+    """B-tree expression indexes on the filtered metadata keys, so a filtered search scans only its partition
+
+    Built CONCURRENTLY like the ANN index, so a loader inserting at the same time is not blocked.
+    """
+    with engine.connect() as conn:
+        if not _index_exists(conn, EMBEDDING_TABLE):
+            return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for key in FILTER_KEYS:
+            name = f"ix_{EMBEDDING_TABLE}_{key}"
+            # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep
+            valid = conn.execute(text(
+                "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+            ), {'name': name}).scalar()
+            if valid is False:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {EMBEDDING_TABLE} ((cmetadata ->> '{key}'))"
+            ))
+
+def check_index(engine, settings: dict) -> bool:
+    """Warn if the configured ANN index is missing, without building it.
+
+    Building alters the embedding column and scans the whole table, so it is left
+    to load_documents.py; searches fall back to a sequential scan until then.
+    """
+    method = settings['vector_index']
+    if method not in INDEX_METHODS:
+        return True
+    name = index_name(method)
+    try:
+        with engine.connect() as conn:
+            if _index_exists(conn, name):
+                return True
+    except Exception as e:
+        print(f"Error checking vector index: {str(e)}")
+        return False
+    print(f"Vector index {name} is missing; run 'python load_documents.py --reindex' to build it")
+    return False
+
+def configure_search(engine, settings: dict):
+    """Apply the query-time ef_search / probes settings to every new pooled connection"""
+    statements = [
+        f"SET hnsw.ef_search = {int(settings['hnsw_ef_search'])}",
+        f"SET ivfflat.probes = {int(settings['ivfflat_probes'])}"
+    ]
+
+    @event.listens_for(engine, "connect")
+    def set_search_parameters(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+        # Keep the session settings past the pool's rollback-on-return
+        dbapi_connection.commit()
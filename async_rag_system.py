@@ -0,0 +1,279 @@
+# async_rag_system.py
+
+import asyncio
+import atexit
+import json
+import re
+import threading
+import time
+import weakref
+from langchain_core.documents import Document
+from sqlalchemy import text
+from text_generation.errors import BadRequestError, ValidationError
+from rag_system import RAGSystem
+from connections import create_async_engine_for_loop, get_async_llm_client, get_settings
+from local_vector_store import LocalVectorStore
+from structured_output import JsonObjectParser
+from chunked_analysis import merge_analyses
+from metrics import timed
+
+# Same cosine-distance lookup PGVector.similarity_search runs, over the langchain tables
+SIMILARITY_SQL = """
+    SELECT e.document, e.cmetadata
+    FROM langchain_pg_embedding e
+    JOIN langchain_pg_collection c ON e.collection_id = c.uuid
+    WHERE c.name = :collection{conditions}
+    ORDER BY e.embedding <=> CAST(:embedding AS vector)
+    LIMIT :k
+"""
+METADATA_KEY = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+# Wait before each LLM retry, doubling per attempt, so a struggling server is not hammered
+RETRY_BACKOFF_SECONDS = 0.5
+
+def similarity_sql(filter: dict = None) -> tuple:
+    """The similarity query with an equality condition per filter key, and its extra parameters.
+
+    Keys are written into the SQL (so the expression index on document_type can
+    be used) and must be plain identifiers; values are bound.
+    """
+    conditions = []
+    params = {}
+    for i, (key, value) in enumerate((filter or {}).items()):
+        if not METADATA_KEY.match(key):
+            raise ValueError(f"Unsupported metadata filter key: {key}")
+        conditions.append(f"\n      AND e.cmetadata ->> '{key}' = :filter_{i}")
+        params[f"filter_{i}"] = str(value)
+    return text(SIMILARITY_SQL.format(conditions=''.join(conditions))), params
+
+class AsyncRAGSystem(RAGSystem):
+    """RAGSystem with asyncio-native embedding, retrieval and generation.
+
+    The async methods (prefixed with ``a``) can be awaited concurrently from any
+    event loop; the inherited synchronous methods are thin wrappers that run them
+    on a private background loop.
+    """
+
+    def __init__(self, collection_name: str = None, max_connections: int = 20):
+        """Initialize sync connections plus async LLM client and Postgres engine settings"""
+        super().__init__()
+        self.collection_name = collection_name or get_settings()['collection_name']
+        self.max_connections = max_connections
+        self.async_llm_client = get_async_llm_client()
+
+        # SQLAlchemy async engines are bound to the event loop that created them
+        self._async_engines = weakref.WeakKeyDictionary()
+        self._sync_loop = None
+        self._sync_loop_thread = None
+        self._sync_loop_lock = threading.Lock()
+
+    def _get_async_engine(self):
+        """Get the async engine for the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        engine = self._async_engines.get(loop)
+        if engine is None:
+            engine = create_async_engine_for_loop(self.max_connections)
+            self._async_engines[loop] = engine
+        return engine
+
+    async def asearch_similar_docs(self, query: str, k: int = 2, filter: dict = None):
+        """Search for similar documents in vector database without blocking the event loop"""
+        try:
+            embedding = await self.embeddings.aembed_query(query)
+            if isinstance(self.store, LocalVectorStore):
+                # In-process search is a NumPy matrix multiply; no database round trip
+                with timed('vector_search'):
+                    return self.store.similarity_search_by_vector(embedding, k=k, filter=filter)
+            sql, params = similarity_sql(filter)
+            with timed('vector_search'):
+                async with self._get_async_engine().connect() as conn:
+                    result = await conn.execute(sql, {
+                        'collection': self.collection_name,
+                        'embedding': json.dumps(embedding),
+                        'k': k,
+                        **params
+                    })
+                    return [
+                        Document(page_content=row.document, metadata=row.cmetadata or {})
+                        for row in result
+                    ]
+        except Exception as e:
+            print(f"Error searching documents: {str(e)}")
+            # Return empty list as fallback
+            return []
+
+    async def aread_stream(self, stream) -> tuple:
+        """Async read_stream: consume tokens until the JSON object closes"""
+        parser = JsonObjectParser()
+        tokens = 0
+        finished = False
+        try:
+            async for response in stream:
+                tokens += 1
+                finished = response.details is not None
+                if not response.token.special and parser.feed(response.token.text):
+                    break
+        finally:
+            # Closing the stream drops the connection, which stops generation on the server
+            await stream.aclose()
+        return parser.text, tokens, parser.complete and not finished
+
+    async def agenerate_answer(self, query: str, similar_docs: list) -> dict:
+        """Generate answer using the async LLM client based on query and similar documents"""
+        try:
+            prompt, prompt_tokens = self.assemble_prompt(query, similar_docs)
+            started = time.perf_counter()
+            tokens_out = 0
+
+            # Generate response with retries
+            self.generation_stats.record_request()
+            max_retries = 3
+            try:
+                for attempt in range(max_retries):
+                    if attempt > 0:
+                        await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                    try:
+                        with timed('llm_generate'):
+                            text, tokens, stopped_early = await self.aread_stream(
+                                self.async_llm_client.generate_stream(prompt, **self.generation_params())
+                            )
+                        tokens_out += tokens
+                        return self.parse_generation(text, tokens, stopped_early, attempt > 0)
+
+                    except json.JSONDecodeError:
+                        if attempt == max_retries - 1:
+                            print(f"Failed to parse JSON after {max_retries} attempts")
+                            self.generation_stats.record_fallback()
+                            # Fallback to date extraction from the document text
+                            return self.fallback_analysis(query)
+
+                    except (BadRequestError, ValidationError) as e:
+                        if not self.use_grammar or attempt == max_retries - 1:
+                            raise
+                        self.disable_grammar(e)
+
+                    except Exception as e:
+                        print(f"Error in attempt {attempt + 1}: {str(e)}")
+                        if attempt == max_retries - 1:
+                            raise
+            finally:
+                self.generation_stats.record_answer(prompt_tokens, tokens_out, time.perf_counter() - started)
+
+        except Exception as e:
+            print(f"Error generating answer: {str(e)}")
+            return None
+
+    async def agenerate_chunked_answer(self, content: str, similar_docs: list) -> dict:
+        """Async map-reduce analysis: analyse the relevant chunks concurrently and merge the results"""
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+
+        async def analyze_chunk(chunk):
+            async with semaphore:
+                return await self.agenerate_answer(chunk, similar_docs)
+
+        results = await asyncio.gather(*(analyze_chunk(chunk) for chunk in self.select_chunks(content)))
+        return merge_analyses(results)
+
+    async def agenerate_analysis(self, content: str, similar_docs: list) -> dict:
+        """Generate the analysis with one LLM call, or map-reduce over chunks for long documents"""
+        if len(content) > self.map_reduce_chars:
+            return await self.agenerate_chunked_answer(content, similar_docs)
+        return await self.agenerate_answer(content, similar_docs)
+
+    async def aretrieve(self, content: str, k: int = 2) -> list:
+        """Retrieval stage: similar chunks of the same type, or of any type if that partition has fewer than k"""
+        query = self.similarity_query(content)
+        filter = self.retrieval_filter(content)
+        if filter:
+            docs = await self.asearch_similar_docs(query, k, filter)
+            if len(docs) >= k:
+                return docs
+        return await self.asearch_similar_docs(query, k)
+
+    async def aanalyze_with_context(self, content: str, similar_docs: list) -> dict:
+        """Generation stage: analyse an upload given its retrieved context"""
+        try:
+            # Reuse the analysis of an identical document with the same retrieved context
+            cache_key = self.analysis_cache_key(content, similar_docs)
+            # The result cache is SQLite; its I/O runs off the event loop
+            cached = await asyncio.to_thread(self.cached_analysis, cache_key)
+            if cached is not None:
+                return cached
+
+            result = await self.agenerate_analysis(content, similar_docs)
+            if result and result.get('analysis_tier') == 'llm':
+                # Fallback answers are not cached (see RAGSystem.analyze_document)
+                await asyncio.to_thread(self.result_cache.put, cache_key, result)
+            elif not result:
+                # Fallback to basic analysis
+                result = self.fallback_analysis(content)
+
+            self.tier_stats.record(result)
+            return result
+
+        except Exception as e:
+            print(f"Error in document analysis: {str(e)}")
+            return None
+
+    async def aanalyze_document(self, content: str) -> dict:
+        """Complete async RAG pipeline for document analysis"""
+        fast = self.try_fast_path(content)
+        if fast is not None:
+            return fast
+        similar_docs = await self.aretrieve(content)
+        return await self.aanalyze_with_context(content, similar_docs)
+
+    async def aclose(self):
+        """Dispose of the async engine and LLM session belonging to the running loop"""
+        engine = self._async_engines.pop(asyncio.get_running_loop(), None)
+        if engine is not None:
+            await engine.dispose()
+        await self.async_llm_client.aclose()
+
+    def submit_coroutine(self, coro):
+        """Schedule a coroutine on the private background loop, returning a concurrent Future"""
+        with self._sync_loop_lock:
+            if self._sync_loop is None:
+                self._sync_loop = asyncio.new_event_loop()
+                self._sync_loop_thread = threading.Thread(
+                    target=self._sync_loop.run_forever, name="async-rag-loop", daemon=True
+                )
+                self._sync_loop_thread.start()
+                # Close the loop's HTTP session and engine before exit, instead of leaving them unclosed
+                atexit.register(self.close)
+        return asyncio.run_coroutine_threadsafe(coro, self._sync_loop)
+
+    def close(self, timeout: float = 5):
+        """Close the private background loop's connections and stop the loop"""
+        with self._sync_loop_lock:
+            loop, thread = self._sync_loop, self._sync_loop_thread
+            self._sync_loop = self._sync_loop_thread = None
+        if loop is None:
+            return
+        atexit.unregister(self.close)
+        try:
+            asyncio.run_coroutine_threadsafe(self.aclose(), loop).result(timeout)
+        except Exception as e:
+            print(f"Error closing async connections: {str(e)}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
+
+    def _run_sync(self, coro):
+        """Run a coroutine to completion on the private background loop"""
+        return self.submit_coroutine(coro).result()
+
+    def search_similar_docs(self, query: str, k: int = 2, filter: dict = None):
+        return self._run_sync(self.asearch_similar_docs(query, k, filter))
+
+    def generate_answer(self, query: str, similar_docs: list) -> dict:
+        return self._run_sync(self.agenerate_answer(query, similar_docs))
+
+    def generate_chunked_answer(self, content: str, similar_docs: list) -> dict:
+        return self._run_sync(self.agenerate_chunked_answer(content, similar_docs))
+
+    def generate_analysis(self, content: str, similar_docs: list) -> dict:
+        return self._run_sync(self.agenerate_analysis(content, similar_docs))
+
+    def analyze_document(self, content: str) -> dict:
+        return self._run_sync(self.aanalyze_document(content))
@@ -0,0 +1,168 @@
+# batch_scheduler.py
+
+import asyncio
+import queue
+
+# Marks the end of a stage's input
+_DONE = object()
+
+class BatchScheduler:
+    """Two-stage (retrieval -> generation) analysis pipeline with bounded concurrency.
+
+    Each stage has its own worker pool and a bounded input queue, so a slow LLM
+    backs up into retrieval and retrieval backs up into reading the input rather
+    than buffering the whole batch in memory. Documents answered by the RAG
+    system's fast path leave after the first stage. Results are yielded in
+    completion order, not input order.
+    """
+
+    def __init__(self, rag, concurrency: int = 8, retrieval_concurrency: int = None,
+                 queue_size: int = None):
+        self.rag = rag
+        self.generation_concurrency = max(1, concurrency)
+        self.retrieval_concurrency = max(1, retrieval_concurrency or concurrency)
+        self.queue_size = queue_size or 2 * self.generation_concurrency
+
+    async def _feed(self, documents, retrieve_queue):
+        """Pull (document_name, content) pairs off the input without blocking the loop.
+
+        If the input raises, the stage is still closed so the workers finish what
+        was read; run() then re-raises the error.
+        """
+        loop = asyncio.get_running_loop()
+        cancelled = False
+        try:
+            iterator = iter(documents)
+            while True:
+                item = await loop.run_in_executor(None, next, iterator, _DONE)
+                if item is _DONE:
+                    break
+                await retrieve_queue.put(item)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                for _ in range(self.retrieval_concurrency):
+                    await retrieve_queue.put(_DONE)
+
+    async def _retrieve_worker(self, retrieve_queue, generate_queue, results_queue, finished):
+        cancelled = False
+        try:
+            while True:
+                item = await retrieve_queue.get()
+                if item is _DONE:
+                    break
+                document_name, content = item
+                try:
+                    # Documents the fast path can answer skip retrieval and generation entirely
+                    doc_info = self.rag.try_fast_path(content)
+                    if doc_info is not None:
+                        await results_queue.put((document_name, doc_info))
+                        continue
+                    try:
+                        similar_docs = await self.rag.aretrieve(content)
+                    except Exception as e:
+                        print(f"Error retrieving context for {document_name}: {str(e)}")
+                        similar_docs = []
+                except Exception as e:
+                    print(f"Error preparing {document_name}: {str(e)}")
+                    await results_queue.put((document_name, None))
+                    continue
+                await generate_queue.put((document_name, content, similar_docs))
+        except asyncio.CancelledError:
+            # run() is tearing the pipeline down; nobody waits for the end markers
+            cancelled = True
+            raise
+        finally:
+            # The last retrieval worker to finish closes the generation stage; counted
+            # even if this one failed, or the generation workers would wait forever
+            finished.append(True)
+            if not cancelled and len(finished) == self.retrieval_concurrency:
+                for _ in range(self.generation_concurrency):
+                    await generate_queue.put(_DONE)
+
+    async def _generate_worker(self, generate_queue, results_queue):
+        while True:
+            item = await generate_queue.get()
+            if item is _DONE:
+                break
+            document_name, content, similar_docs = item
+            try:
+                doc_info = await self.rag.aanalyze_with_context(content, similar_docs)
+            except Exception as e:
+                print(f"Error analyzing {document_name}: {str(e)}")
+                doc_info = None
+            await results_queue.put((document_name, doc_info))
+        await results_queue.put(_DONE)
+
+    async def run(self, documents):
+        """Analyse (document_name, content) pairs, yielding (document_name, doc_info) as they complete"""
+        retrieve_queue = asyncio.Queue(maxsize=self.queue_size)
+        generate_queue = asyncio.Queue(maxsize=self.queue_size)
+        results_queue = asyncio.Queue(maxsize=self.queue_size)
+        finished = []
+
+        feed = asyncio.create_task(self._feed(documents, retrieve_queue))
+        tasks = [feed]
+        tasks += [
+            asyncio.create_task(self._retrieve_worker(retrieve_queue, generate_queue, results_queue, finished))
+            for _ in range(self.retrieval_concurrency)
+        ]
+        tasks += [
+            asyncio.create_task(self._generate_worker(generate_queue, results_queue))
+            for _ in range(self.generation_concurrency)
+        ]
+
+        try:
+            remaining = self.generation_concurrency
+            while remaining:
+                result = await results_queue.get()
+                if result is _DONE:
+                    remaining -= 1
+                else:
+                    yield result
+            # Raises the input's error, if reading it failed part-way
+            await feed
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def run_sync(self, documents):
+        """Blocking generator over run(), executed on the RAG system's background loop"""
+        results = queue.Queue(maxsize=self.queue_size)
+
+        async def drain():
+            loop = asyncio.get_running_loop()
+            try:
+                async for result in self.run(documents):
+                    # Block the pipeline (not the loop) while the consumer catches up
+                    await loop.run_in_executor(None, results.put, result)
+            except asyncio.CancelledError:
+                # The consumer has gone away; nobody is waiting for the end marker
+                raise
+            except Exception:
+                await loop.run_in_executor(None, results.put, _DONE)
+                raise
+            await loop.run_in_executor(None, results.put, _DONE)
+
+        future = self.rag.submit_coroutine(drain())
+        completed = False
+        try:
+            while True:
+                result = results.get()
+                if result is _DONE:
+                    completed = True
+                    break
+                yield result
+        finally:
+            if not completed:
+                # Consumer stopped early: cancel the pipeline and unblock any pending put
+                future.cancel()
+                try:
+                    while True:
+                        results.get_nowait()
+                except queue.Empty:
+                    pass
+        # Surface any error raised inside the pipeline
+        future.result()
@@ -0,0 +1,152 @@
+# bench_ann_index.py
+"""Recall vs latency of pgvector HNSW and IVFFlat indexes against an exact scan.
+
+Needs the pgvector container on :9003 (or the database in the connection settings).
+Run from the repository root:
+    python benchmarks/bench_ann_index.py [--sizes 10000 100000 1000000] [--dim 1024]
+
+Each size loads clustered synthetic embeddings into a scratch table, measures the
+sequential scan, then builds each index and sweeps hnsw.ef_search / ivfflat.probes.
+Recall@k is measured against exact top-k computed with NumPy.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+import numpy as np
+import psycopg
+from pgvector.psycopg import register_vector
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from connections import get_settings
+from vector_index import ivfflat_lists
+
+BLOCK_ROWS = 20_000
+SWEEPS = {
+    'hnsw': ('hnsw.ef_search', [10, 20, 40, 80, 160]),
+    'ivfflat': ('ivfflat.probes', [1, 5, 10, 20, 50])
+}
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+class Corpus:
+    """Clustered unit vectors generated block by block, so 1M x 1024 never sits in memory"""
+
+    def __init__(self, dim: int, clusters: int = 256, seed: int = 0):
+        self.dim = dim
+        self.seed = seed
+        self.centers = normalize(np.random.default_rng(seed).normal(size=(clusters, dim)))
+
+    def _sample(self, rng, rows: int) -> np.ndarray:
+        labels = rng.integers(len(self.centers), size=rows)
+        noise = rng.normal(scale=0.6 / np.sqrt(self.dim), size=(rows, self.dim))
+        return normalize(self.centers[labels] + noise).astype(np.float32)
+
+    def block(self, index: int, rows: int) -> np.ndarray:
+        return self._sample(np.random.default_rng((self.seed, index)), rows)
+
+    def queries(self, count: int) -> np.ndarray:
+        # Drawn from the same clusters as the corpus, but from a stream no block uses
+        return self._sample(np.random.default_rng((self.seed, 1 << 31)), count)
+
+def load_table(conn, table: str, corpus: Corpus, size: int, queries: np.ndarray, k: int) -> np.ndarray:
+    """Bulk-load size rows with binary COPY, returning the exact top-k ids per query"""
+    conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.execute(f"CREATE TABLE {table} (id bigint PRIMARY KEY, embedding vector({corpus.dim}))")
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), k), dtype=np.int64)
+
+    started = time.perf_counter()
+    for index, offset in enumerate(range(0, size, BLOCK_ROWS)):
+        rows = min(BLOCK_ROWS, size - offset)
+        vectors = corpus.block(index, rows)
+        with conn.cursor().copy(f"COPY {table} (id, embedding) FROM STDIN WITH (FORMAT BINARY)") as copy:
+            copy.set_types(['int8', 'vector'])
+            for i, vector in enumerate(vectors):
+                copy.write_row((offset + i, vector))
+
+        # Merge this block into the running exact top-k (cosine = dot product of unit vectors)
+        scores = queries @ vectors.T
+        ids = np.broadcast_to(np.arange(offset, offset + rows), scores.shape)
+        scores = np.concatenate([best_scores, scores], axis=1)
+        ids = np.concatenate([best_ids, ids], axis=1)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_ids = np.take_along_axis(ids, top, axis=1)
+    conn.execute(f"ANALYZE {table}")
+    print(f"  loaded {size} rows in {time.perf_counter() - started:.1f}s")
+    return best_ids
+
+def measure(conn, table: str, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    """Run every query, returning p50/p99 latency in ms and mean recall@k"""
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        rows = conn.execute(
+            f"SELECT id FROM {table} ORDER BY embedding <=> %s LIMIT %s", (query, k)
+        ).fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len({row[0] for row in rows} & set(expected.tolist())) / k)
+    return {
+        'p50': float(np.percentile(latencies, 50)),
+        'p99': float(np.percentile(latencies, 99)),
+        'recall': float(np.mean(recalls))
+    }
+
+def report(label: str, result: dict):
+    print(f"  {label:<28} p50 {result['p50']:8.2f} ms   p99 {result['p99']:8.2f} ms   recall@k {result['recall']:.3f}")
+
+def bench_size(conn, corpus: Corpus, size: int, queries: np.ndarray, args):
+    table = f"bench_ann_{size}"
+    print(f"\n{size} embeddings x {corpus.dim} dims")
+    truth = load_table(conn, table, corpus, size, queries, args.k)
+    report("sequential scan", measure(conn, table, queries, truth, args.k))
+
+    for method in args.methods:
+        if method == 'hnsw':
+            options = f"m = {args.m}, ef_construction = {args.ef_construction}"
+        else:
+            options = f"lists = {ivfflat_lists(size)}"
+        started = time.perf_counter()
+        conn.execute(f"SET maintenance_work_mem = '{args.maintenance_work_mem}'")
+        conn.execute(
+            f"CREATE INDEX {table}_{method} ON {table} USING {method} (embedding vector_cosine_ops) WITH ({options})"
+        )
+        print(f"  {method} ({options}) built in {time.perf_counter() - started:.1f}s")
+        parameter, values = SWEEPS[method]
+        for value in values:
+            conn.execute(f"SET {parameter} = {value}")
+            report(f"{method} {parameter}={value}", measure(conn, table, queries, truth, args.k))
+        conn.execute(f"DROP INDEX {table}_{method}")
+
+    if not args.keep:
+        conn.execute(f"DROP TABLE {table}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--dim', type=int, default=1024, help='Embedding dimension (bge-large-en-v1.5: 1024)')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--methods', nargs='+', choices=list(SWEEPS), default=list(SWEEPS))
+    parser.add_argument('--m', type=int, default=16)
+    parser.add_argument('--ef-construction', type=int, default=64)
+    parser.add_argument('--maintenance-work-mem', default='2GB')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch tables')
+    args = parser.parse_args()
+
+    # psycopg 3 for binary COPY; the async URL already names that driver
+    url = get_settings()['async_database_url'].replace('postgresql+psycopg://', 'postgresql://')
+    with psycopg.connect(url, autocommit=True) as conn:
+        conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        register_vector(conn)
+        corpus = Corpus(args.dim)
+        queries = corpus.queries(args.queries)
+        for size in args.sizes:
+            bench_size(conn, corpus, size, queries, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# bench_date_extraction.py
+"""Microbenchmark: compiled date scanner vs the original regex/strptime extraction.
+
+Run from the repository root:
+    python benchmarks/bench_date_extraction.py [--repeat 200]
+"""
+
+import argparse
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from date_extraction import clean_date, extract_dates, extract_dates_many
+
+CORPUS = Path(__file__).resolve().parent.parent / "RAG" / "data" / "test-documents"
+
+def legacy_clean_date(date_str: str) -> str:
+    """RAGSystem.clean_date before the date_extraction module"""
+    try:
+        for fmt in [
+            "%d/%m/%Y", "%Y-%m-%d", "%B %d, %Y", "%d %B %Y",
+            "%Y/%m/%d", "%d-%m-%Y", "%d.%m.%Y"
+        ]:
+            try:
+                return datetime.strptime(date_str, fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+        return None
+    except Exception:
+        return None
+
+def legacy_extract_dates(text: str) -> list:
+    """RAGSystem.extract_dates_from_text before the date_extraction module"""
+    patterns = [
+        r'\d{4}-\d{2}-\d{2}',
+        r'\d{2}/\d{2}/\d{4}',
+        r'\d{1,2}\s(?:January|February|March|April|May|June|July|August|September|October|November|December)\s\d{4}',
+        r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s\d{1,2},?\s\d{4}'
+    ]
+    dates = []
+    for pattern in patterns:
+        for match in re.finditer(pattern, text):
+            cleaned_date = legacy_clean_date(match.group())
+            if cleaned_date:
+                dates.append(cleaned_date)
+    return list(set(dates))
+
+def timed(func, repeat: int) -> float:
+    """Best-of-3 wall time of calling func() `repeat` times"""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark date extraction on the test-documents corpus')
+    parser.add_argument('--repeat', type=int, default=200, help='Passes over the corpus per timing (default: 200)')
+    args = parser.parse_args()
+
+    texts = [path.read_text() for path in sorted(CORPUS.glob("*.txt"))]
+    print(f"Corpus: {len(texts)} documents, {sum(len(text) for text in texts)} characters")
+
+    # The new scanner must find the same dates (the legacy order was set-dependent)
+    mismatches = [
+        i for i, text in enumerate(texts)
+        if set(extract_dates(text)) != set(legacy_extract_dates(text))
+    ]
+    print(f"Documents with differing results: {len(mismatches)}")
+
+    samples = ["28/02/2025", "2025-02-28", "February 28, 2025", "28 February 2025",
+               "2025/02/28", "28-02-2025", "28.02.2025", "not a date", "31/02/2025"]
+    assert [clean_date(s) for s in samples] == [legacy_clean_date(s) for s in samples]
+
+    docs = len(texts) * args.repeat
+    results = [
+        ("legacy extract_dates_from_text", timed(lambda: [legacy_extract_dates(t) for t in texts], args.repeat)),
+        ("extract_dates (per document)", timed(lambda: [extract_dates(t) for t in texts], args.repeat)),
+        ("extract_dates_many (one call)", timed(lambda: extract_dates_many(texts), args.repeat)),
+    ]
+    baseline = results[0][1]
+    for name, seconds in results:
+        print(f"{name:34s} {seconds / docs * 1e6:8.2f} us/doc  {baseline / seconds:5.1f}x")
+
+    parses = len(samples) * args.repeat * 10
+    legacy = timed(lambda: [legacy_clean_date(s) for s in samples * 10], args.repeat)
+    compiled = timed(lambda: [clean_date(s) for s in samples * 10], args.repeat)
+    print(f"{'legacy clean_date':34s} {legacy / parses * 1e6:8.2f} us/date")
+    print(f"{'clean_date':34s} {compiled / parses * 1e6:8.2f} us/date  {legacy / compiled:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# bench_pipeline.py
+"""End-to-end throughput, latency and memory of the loader, the deadline manager and the web app.
+
+Runs entirely offline against the fake TGI and TEI servers in fake_services.py
+and the local vector store, so no GPU, containers or network are needed.
+Run from the repository root:
+    python benchmarks/bench_pipeline.py [--documents 150] [--analyze 50] [--phases loader manager flask]
+
+A labelled corpus is generated with synthetic_corpus.py, loaded with
+load_documents.main, then documents are analysed one at a time through
+DocumentDeadlineManager.process_new_document and through the Flask endpoints
+(POST /analyze, GET /jobs/<id>, GET /deadlines/all). Each phase runs in its own
+process so its peak RSS is its own. Loader latencies are per insert batch, read
+from the stage histograms (bucket upper bounds); all others are exact. The
+manager phase also scores its deadlines and types against the corpus labels.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+PHASES = ('loader', 'manager', 'flask')
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def result_row(name: str, latencies: list, seconds: float, items: int = None) -> dict:
+    items = len(latencies) if items is None else items
+    return {
+        'name': name,
+        'items': items,
+        'seconds': seconds,
+        'throughput': items / seconds if seconds else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50)) * 1000 if len(latencies) else 0.0,
+        'p99_ms': float(np.percentile(latencies, 99)) * 1000 if len(latencies) else 0.0
+    }
+
+def documents(corpus: Path, count: int, offset: int = 0) -> list:
+    paths = sorted(corpus.glob("*.txt"))[offset:offset + count]
+    return [(path.name, path.read_text()) for path in paths]
+
+def run_loader(args) -> list:
+    import load_documents
+    from metrics import METRICS
+    corpus = Path(args.workdir) / "corpus"
+    sys.argv = ['load_documents.py', '--directory', str(corpus), '--manifest', str(Path(args.workdir) / "manifest.json")]
+    started = time.perf_counter()
+    load_documents.main()
+    seconds = time.perf_counter() - started
+    batches = METRICS.stage_summary().get('load_insert', {})
+    row = result_row('loader (files)', [], seconds, items=len(list(corpus.glob("*.txt"))))
+    row['p50_ms'] = batches.get('p50_seconds', 0.0) * 1000
+    row['p99_ms'] = batches.get('p99_seconds', 0.0) * 1000
+    return [row]
+
+def score(labels: dict, results: dict) -> dict:
+    """Share of stored deadlines matching the ground truth, by deadline source, and of stored types.
+
+    Documents without dates ('none') have no fixed answer: the manager infers from
+    the upload date, so they are checked against that within a day and left out of 'all'.
+    """
+    from datetime import timedelta
+    from deadline_manager import DOCUMENT_PATTERNS
+    hits = {}
+    types = stored = 0
+    for name, row in results.items():
+        label = labels[name]
+        if label['deadline_source'] == 'none':
+            period = timedelta(days=DOCUMENT_PATTERNS[label['document_type']]['period'])
+            correct = bool(row) and abs(row['deadline_date'] - (row['upload_date'] + period)) <= timedelta(days=1)
+            sources = ('none',)
+        else:
+            deadline = row['deadline_date'].strftime('%Y-%m-%d') if row else None
+            correct = deadline == label['expected_deadline']
+            sources = ('all', label['deadline_source'])
+        for source in sources:
+            seen, hit = hits.get(source, (0, 0))
+            hits[source] = (seen + 1, hit + correct)
+        if row:
+            stored += 1
+            types += row['document_type'] == label['document_type']
+    accuracy = {f"deadlines_{source}": correct / seen for source, (seen, correct) in hits.items()}
+    accuracy['types'] = types / stored if stored else 0.0
+    return accuracy
+
+def run_manager(args) -> list:
+    from deadline_manager import DocumentDeadlineManager
+    from synthetic_corpus import read_labels
+    corpus = Path(args.workdir) / "corpus"
+    manager = DocumentDeadlineManager()
+    latencies = []
+    results = {}
+    started = time.perf_counter()
+    for name, content in documents(corpus, args.analyze):
+        began = time.perf_counter()
+        results[name] = manager.process_new_document(content, name)
+        latencies.append(time.perf_counter() - began)
+    row = result_row('manager.process_new_document', latencies, time.perf_counter() - started)
+    row['accuracy'] = score(read_labels(corpus), results)
+    return [row]
+
+def run_flask(args) -> list:
+    import io
+    # The app runs from app/, whose modules mirror the ones at the root
+    sys.path.insert(0, str(ROOT / "app"))
+    import app as web
+    client = web.app.test_client()
+    rows = []
+
+    # Different documents from the manager phase, so neither reuses the other's work
+    docs = documents(Path(args.workdir) / "corpus", args.analyze, offset=args.analyze)
+    submit_latencies = []
+    job_ids = []
+    started = time.perf_counter()
+    for name, content in docs:
+        began = time.perf_counter()
+        response = client.post('/analyze', data={'file': (io.BytesIO(content.encode()), name)})
+        submit_latencies.append(time.perf_counter() - began)
+        job_ids.append(response.get_json()['job_id'])
+    rows.append(result_row('POST /analyze (submit)', submit_latencies, time.perf_counter() - started))
+
+    pending = set(job_ids)
+    jobs = {}
+    while pending:
+        for job_id in list(pending):
+            job = client.get(f'/jobs/{job_id}').get_json()
+            if job['status'] in ('done', 'failed'):
+                jobs[job_id] = job
+                pending.discard(job_id)
+        time.sleep(0.01)
+    first = min(job['created_at'] for job in jobs.values())
+    last = max(job['finished_at'] for job in jobs.values())
+    rows.append(result_row(
+        'analyze job (queued to done)',
+        [job['finished_at'] - job['created_at'] for job in jobs.values()],
+        last - first
+    ))
+
+    page_latencies = []
+    started = time.perf_counter()
+    for _ in range(args.pages):
+        began = time.perf_counter()
+        client.get('/deadlines/all?limit=100').get_data()
+        page_latencies.append(time.perf_counter() - began)
+    rows.append(result_row('GET /deadlines/all', page_latencies, time.perf_counter() - started))
+    web.jobs.stop()
+    return rows
+
+def run_phase(args):
+    """Child process: run one phase and write its rows and stage timings as JSON"""
+    sys.path.insert(0, str(ROOT))
+    runner = {'loader': run_loader, 'manager': run_manager, 'flask': run_flask}[args.phase]
+    rows = runner(args)
+    from metrics import METRICS
+    for row in rows:
+        row['peak_rss_mb'] = peak_rss_mb()
+    output = {'rows': rows, 'stages': METRICS.stage_summary()}
+    (Path(args.workdir) / f"{args.phase}.json").write_text(json.dumps(output))
+
+def phase_environment(workdir: Path, phase: str, tgi, tei) -> dict:
+    """Settings pointing a phase at the fake services and at scratch copies of every cache and store"""
+    state = workdir / phase
+    state.mkdir(parents=True, exist_ok=True)
+    return {
+        **os.environ,
+        'ASSET_LAYER_CONFIG': str(workdir / "asset_layer.json"),
+        'ASSET_LAYER_LLM_URL': tgi.url,
+        'ASSET_LAYER_EMBEDDINGS_URL': tei.url,
+        'ASSET_LAYER_VECTOR_BACKEND': 'local',
+        'ASSET_LAYER_LOCAL_VECTOR_PATH': str(workdir / "vector_store"),
+        'ASSET_LAYER_EMBEDDING_CACHE': str(state / "embeddings.sqlite3"),
+        'ASSET_LAYER_RESULT_CACHE': str(state / "analysis_results.sqlite3"),
+        'ASSET_LAYER_DEADLINE_REGISTRY': str(state / "deadline_registry"),
+        'ASSET_LAYER_JOB_QUEUE': str(state / "jobs.sqlite3")
+    }
+
+def print_report(results: dict, show_stages: bool):
+    print(f"\n{'benchmark':<32}{'items':>8}{'seconds':>10}{'per s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    for phase, result in results.items():
+        for row in result['rows']:
+            print(
+                f"{row['name']:<32}{row['items']:>8}{row['seconds']:>10.2f}{row['throughput']:>10.1f}"
+                f"{row['p50_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['peak_rss_mb']:>10.0f}"
+            )
+    for phase, result in results.items():
+        for row in result['rows']:
+            if 'accuracy' in row:
+                print(f"\n{row['name']} accuracy against the corpus labels:")
+                for name, value in row['accuracy'].items():
+                    print(f"  {name:<20}{value:>8.1%}")
+    if show_stages:
+        for phase, result in results.items():
+            print(f"\n{phase} stages:")
+            for stage, s in result['stages'].items():
+                print(
+                    f"  {stage:<14}{s['count']:>8}  mean {s['mean_seconds'] * 1000:8.1f} ms"
+                    f"  p99 {s['p99_seconds'] * 1000:8.1f} ms  total {s['total_seconds']:8.2f} s"
+                )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--documents', type=int, default=150, help='Corpus size for the loader')
+    parser.add_argument('--analyze', type=int, default=50, help='Documents analysed by the manager and Flask phases')
+    parser.add_argument('--pages', type=int, default=50, help='GET /deadlines/all requests in the Flask phase')
+    parser.add_argument('--phases', nargs='+', choices=PHASES, default=list(PHASES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--first-token-ms', type=float, default=50.0, help='Fake TGI time to first token')
+    parser.add_argument('--token-ms', type=float, default=2.0, help='Fake TGI time per token')
+    parser.add_argument('--embed-ms', type=float, default=5.0, help='Fake TEI time per request')
+    parser.add_argument('--dimension', type=int, default=1024)
+    parser.add_argument('--workdir', help='Scratch directory (default: a temporary one, removed afterwards)')
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--stages', action='store_true', help='Print per-stage timings for each phase')
+    parser.add_argument('--phase', choices=PHASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        run_phase(args)
+        return
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    sys.path.insert(0, str(ROOT))
+    from fake_services import FakeTEI, FakeTGI
+    from synthetic_corpus import write_corpus
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="asset_layer_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    tgi = FakeTGI(first_token_seconds=args.first_token_ms / 1000, token_seconds=args.token_ms / 1000).start()
+    tei = FakeTEI(latency_seconds=args.embed_ms / 1000, dimension=args.dimension).start()
+    results = {}
+    try:
+        corpus = workdir / "corpus"
+        if not corpus.exists():
+            write_corpus(corpus, max(args.documents, 2 * args.analyze), args.seed)
+        for phase in args.phases:
+            print(f"Running {phase} phase...")
+            command = [sys.executable, __file__, '--phase', phase, '--workdir', str(workdir),
+                       '--analyze', str(args.analyze), '--pages', str(args.pages)]
+            with open(workdir / f"{phase}.log", 'w') as log:
+                completed = subprocess.run(
+                    command, cwd=workdir, env=phase_environment(workdir, phase, tgi, tei),
+                    stdout=log, stderr=subprocess.STDOUT
+                )
+            if completed.returncode != 0:
+                print(f"{phase} phase failed; see {workdir / f'{phase}.log'}")
+                continue
+            results[phase] = json.loads((workdir / f"{phase}.json").read_text())
+    finally:
+        tgi.stop()
+        tei.stop()
+
+    print_report(results, args.stages)
+    print(f"\nFake TGI requests: {tgi.requests}, fake TEI texts: {tei.requests}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
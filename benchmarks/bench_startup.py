@@ -0,0 +1,121 @@
+# bench_startup.py
+"""Cold-start import profile of the CLI and the Flask app.
+
+Each target runs in fresh interpreters under `python -X importtime`. The report
+shows the median wall time, the modules loaded, which heavy dependencies were
+pulled in, and the slowest packages by cumulative import time:
+- main:       import main.py, enough to show the menu
+- app:        import app/app.py and serve GET /deadlines/all once
+- manager:    build a DocumentDeadlineManager and read a page of deadlines
+- rag:        import rag_system, the full LLM stack (for comparison)
+Run from the repository root:
+    python benchmarks/bench_startup.py [--runs 5] [--top 15] [--check]
+
+With --check the exit status is 1 if main, app or manager load a heavy dependency,
+so startup regressions can fail CI.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Modules the startup path must not need: the LLM/embedding/database clients and pandas
+HEAVY_MODULES = ('pandas', 'langchain', 'langchain_community', 'langchain_core', 'text_generation', 'sqlalchemy', 'aiohttp')
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| *(\S+)')
+# Imported by the interpreter itself, or the targets themselves
+IGNORED_PACKAGES = {
+    'site', 'encodings', 'io', 'abc', 'codecs', '_frozen_importlib_external',
+    'main', 'app', 'deadline_manager', 'rag_system'
+}
+
+REPORT = """
+import json, sys, time
+report = {'seconds': time.perf_counter() - STARTED, 'modules': len(sys.modules),
+          'heavy': [name for name in HEAVY if name in sys.modules]}
+print('STARTUP ' + json.dumps(report))
+"""
+TARGETS = {
+    'main': (ROOT, "import main"),
+    'app': (ROOT / "app", (
+        "import app\n"
+        "assert app.app.test_client().get('/deadlines/all').status_code == 200\n"
+        "app.jobs.stop()"
+    )),
+    'manager': (ROOT, (
+        "from deadline_manager import DocumentDeadlineManager\n"
+        "DocumentDeadlineManager().get_deadline_page('upcoming')"
+    )),
+    'rag': (ROOT, "import rag_system")
+}
+# Targets held to the no-heavy-imports rule by --check
+CHECKED_TARGETS = ('main', 'app', 'manager')
+
+def run_target(name: str, scratch: Path) -> tuple:
+    """Run a target once in a fresh interpreter, returning its report and per-module cumulative import times"""
+    directory, code = TARGETS[name]
+    script = (
+        f"import sys, time\nSTARTED = time.perf_counter()\nHEAVY = {HEAVY_MODULES!r}\n"
+        f"sys.path.insert(0, {str(directory)!r})\n{code}\n{REPORT}"
+    )
+    # Scratch registry and job queue, so the run neither reads nor writes real state
+    env = {
+        **os.environ,
+        'ASSET_LAYER_DEADLINE_REGISTRY': str(scratch / "deadline_registry"),
+        'ASSET_LAYER_JOB_QUEUE': str(scratch / "jobs.sqlite3")
+    }
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        cwd=scratch, env=env, capture_output=True, text=True
+    )
+    lines = [line for line in completed.stdout.splitlines() if line.startswith('STARTUP ')]
+    if completed.returncode != 0 or not lines:
+        raise RuntimeError(f"{name} failed:\n{completed.stderr[-2000:]}")
+    imports = {}
+    for match in IMPORT_LINE.finditer(completed.stderr):
+        # A package's first import includes its submodules, so its largest cumulative time is its cost
+        package = match.group(3).split('.')[0]
+        if package not in IGNORED_PACKAGES:
+            imports[package] = max(imports.get(package, 0.0), int(match.group(2)) / 1e6)
+    return json.loads(lines[-1][len('STARTUP '):]), imports
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per target (median reported)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest packages listed per target')
+    parser.add_argument('--check', action='store_true', help='Fail if main, app or manager load a heavy dependency')
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'target':<10}{'median s':>10}{'min s':>8}{'modules':>9}  heavy dependencies loaded")
+    profiles = {}
+    with tempfile.TemporaryDirectory(prefix="asset_layer_startup_") as scratch:
+        for name in args.targets:
+            runs = [run_target(name, Path(scratch)) for _ in range(args.runs)]
+            seconds = [report['seconds'] for report, _ in runs]
+            report, imports = runs[-1]
+            profiles[name] = imports
+            print(
+                f"{name:<10}{statistics.median(seconds):>10.2f}{min(seconds):>8.2f}{report['modules']:>9}  "
+                f"{', '.join(report['heavy']) or '-'}"
+            )
+            if args.check and name in CHECKED_TARGETS and report['heavy']:
+                failed = True
+
+    for name, imports in profiles.items():
+        print(f"\n{name}: slowest packages (cumulative import time)")
+        for module, seconds in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {module:<32}{seconds * 1000:>9.1f} ms")
+    if failed:
+        print("\nStartup check failed: a heavy dependency is imported on the startup path")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
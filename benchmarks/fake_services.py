@@ -0,0 +1,215 @@
+# fake_services.py
+"""Deterministic local stand-ins for the TGI (:9001) and TEI (:9002) containers.
+
+Both speak enough of the real HTTP APIs for the project's clients:
+- FakeTGI answers streaming generate requests with server-sent events. The
+  answer is a canned JSON analysis derived from the document in the prompt,
+  or a fixed one, and is sent with configurable first-token and per-token latency.
+- FakeTEI answers feature-extraction requests with hashed bag-of-words unit
+  vectors, so similar documents get similar embeddings.
+
+Run standalone to point the app or the CLI at them:
+    python benchmarks/fake_services.py [--llm-port 9001] [--embeddings-port 9002]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from date_extraction import extract_dates
+from fast_classifier import EXPIRY_LABEL, ISSUE_LABEL, guess_type, labelled_dates
+
+DEFAULT_DIMENSION = 1024
+# Characters per streamed token, roughly what Llama tokenizers produce for JSON
+TOKEN_CHARS = 4
+DOCUMENT_SECTION = re.compile(r'Document content:(.*?)Provide ONLY the JSON response', re.DOTALL)
+WORD = re.compile(r'[a-z0-9]+')
+
+def canned_analysis(prompt: str) -> dict:
+    """The analysis a well-behaved model would give for the document in a prompt"""
+    match = DOCUMENT_SECTION.search(prompt)
+    document = match.group(1) if match else prompt
+    expiry = labelled_dates(document, EXPIRY_LABEL)
+    issued = labelled_dates(document, ISSUE_LABEL)
+    dates = extract_dates(document)
+    explicit_deadline = expiry[0] if expiry else None
+    # Without an issue label, take the latest other date (assessment or generation date) as a model would
+    undated = [date for date in dates if date != explicit_deadline]
+    document_date = issued[0] if issued else (max(undated) if undated else None)
+    return {
+        "document_type": guess_type(document) or "BBBEE Certificate",
+        "explicit_deadline": explicit_deadline,
+        "document_date": document_date,
+        "other_dates": [date for date in dates if date not in (explicit_deadline, document_date)][:16]
+    }
+
+def hashed_embedding(text: str, dimension: int = DEFAULT_DIMENSION) -> list:
+    """Unit vector of hashed word counts"""
+    vector = np.zeros(dimension, dtype=np.float32)
+    for word in WORD.findall(text.lower()):
+        digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], 'little') % dimension
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        vector[0] = 1.0
+        norm = 1.0
+    return (vector / norm).tolist()
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so the clients' keep-alive connections are exercised
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def send_json(self, payload, status: int = 200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunk(self, data: bytes):
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+class _TGIHandler(_Handler):
+    def do_POST(self):
+        request = self.read_json()
+        service = self.server.service
+        service.count()
+        text = json.dumps(service.answer(request.get('inputs', '')))
+        tokens = [text[i:i + TOKEN_CHARS] for i in range(0, len(text), TOKEN_CHARS)]
+        if not request.get('stream'):
+            time.sleep(service.first_token_seconds + service.token_seconds * len(tokens))
+            self.send_json([{'generated_text': text}])
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        time.sleep(service.first_token_seconds)
+        try:
+            for i, token in enumerate(tokens):
+                last = i == len(tokens) - 1
+                event = {
+                    'token': {'id': i, 'text': token, 'logprob': 0.0, 'special': False},
+                    'generated_text': text if last else None,
+                    'details': {'finish_reason': 'eos_token', 'generated_tokens': len(tokens), 'seed': None} if last else None
+                }
+                self.send_chunk(b'data:' + json.dumps(event).encode() + b'\n\n')
+                time.sleep(service.token_seconds)
+            self.send_chunk(b'')
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stops reading once the JSON object closes
+            self.close_connection = True
+
+class _TEIHandler(_Handler):
+    def do_POST(self):
+        request = self.read_json()
+        service = self.server.service
+        inputs = request.get('inputs', [])
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else inputs
+        service.count(len(texts))
+        time.sleep(service.latency_seconds)
+        vectors = [hashed_embedding(text, service.dimension) for text in texts]
+        self.send_json(vectors[0] if single else vectors)
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections at exit are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class _Service:
+    handler = None
+
+    def __init__(self, port: int = 0):
+        self.server = _Server(('127.0.0.1', port), self.handler)
+        self.server.service = self
+        self.thread = None
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, n: int = 1):
+        with self.lock:
+            self.requests += n
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class FakeTGI(_Service):
+    """Streaming text-generation server with configurable latency and canned JSON answers"""
+    handler = _TGIHandler
+
+    def __init__(self, port: int = 0, first_token_seconds: float = 0.05, token_seconds: float = 0.002,
+                 answer: dict = None):
+        super().__init__(port)
+        self.first_token_seconds = first_token_seconds
+        self.token_seconds = token_seconds
+        self.fixed_answer = answer
+
+    def answer(self, prompt: str) -> dict:
+        return self.fixed_answer if self.fixed_answer is not None else canned_analysis(prompt)
+
+class FakeTEI(_Service):
+    """Feature-extraction server returning deterministic hashed embeddings"""
+    handler = _TEIHandler
+
+    def __init__(self, port: int = 0, latency_seconds: float = 0.005, dimension: int = DEFAULT_DIMENSION):
+        super().__init__(port)
+        self.latency_seconds = latency_seconds
+        self.dimension = dimension
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--llm-port', type=int, default=9001)
+    parser.add_argument('--embeddings-port', type=int, default=9002)
+    parser.add_argument('--first-token-ms', type=float, default=50.0)
+    parser.add_argument('--token-ms', type=float, default=2.0)
+    parser.add_argument('--embed-ms', type=float, default=5.0)
+    parser.add_argument('--dimension', type=int, default=DEFAULT_DIMENSION)
+    parser.add_argument('--answer', help='JSON file with a fixed analysis to return for every prompt')
+    args = parser.parse_args()
+
+    answer = json.loads(Path(args.answer).read_text()) if args.answer else None
+    tgi = FakeTGI(args.llm_port, args.first_token_ms / 1000, args.token_ms / 1000, answer).start()
+    tei = FakeTEI(args.embeddings_port, args.embed_ms / 1000, args.dimension).start()
+    print(f"Fake TGI on {tgi.url}, fake TEI on {tei.url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        tgi.stop()
+        tei.stop()
+
+if __name__ == "__main__":
+    main()
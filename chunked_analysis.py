@@ -0,0 +1,70 @@
+# chunked_analysis.py
+
+import os
+from collections import Counter
+from langchain.text_splitter import CharacterTextSplitter
+from prompt_builder import passage_relevance
+
+# Documents longer than this are analysed chunk by chunk
+DEFAULT_MAP_REDUCE_CHARS = int(os.environ.get("ASSET_LAYER_MAP_REDUCE_CHARS", "4000"))
+DEFAULT_CHUNK_SIZE = 512
+DEFAULT_MAX_CHUNKS = 16
+DEFAULT_CHUNK_CONCURRENCY = 4
+
+def split_document(content: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> list:
+    """Split an upload the same way load_documents.py splits files"""
+    text_splitter = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=0)
+    return text_splitter.split_text(content)
+
+def select_chunks(chunks: list, max_chunks: int = DEFAULT_MAX_CHUNKS) -> list:
+    """Keep the chunks that mention dates or deadline language, in document order.
+
+    The first chunk is always kept since it usually names the certificate. If more
+    than max_chunks qualify, the highest scoring ones are kept.
+    """
+    scored = [
+        (i, passage_relevance(chunk)) for i, chunk in enumerate(chunks)
+    ]
+    candidates = [(i, score) for i, score in scored if score > 0 or i == 0]
+    if len(candidates) > max_chunks:
+        candidates = sorted(candidates, key=lambda item: (item[0] != 0, -item[1], item[0]))[:max_chunks]
+    return [chunks[i] for i, _ in sorted(candidates)]
+
+def merge_analyses(results: list) -> dict:
+    """Reduce per-chunk analyses into one doc_info.
+
+    The document type is the majority vote (ties go to the earliest chunk), the
+    deadline is the earliest explicit deadline found, the document date is the
+    first one found, and every other date is kept once.
+    """
+    results = [result for result in results if result]
+    if not results:
+        return None
+
+    types = [result.get('document_type') for result in results if result.get('document_type')]
+    document_type = None
+    if types:
+        counts = Counter(types)
+        document_type = max(types, key=lambda value: (counts[value], -types.index(value)))
+
+    deadlines = [result['explicit_deadline'] for result in results if result.get('explicit_deadline')]
+    explicit_deadline = min(deadlines) if deadlines else None
+
+    document_date = next(
+        (result['document_date'] for result in results if result.get('document_date')), None
+    )
+
+    other_dates = {}
+    for result in results:
+        for date in (result.get('explicit_deadline'), *(result.get('other_dates') or [])):
+            if date and date not in (explicit_deadline, document_date):
+                other_dates[date] = None
+
+    return {
+        "document_type": document_type,
+        "explicit_deadline": explicit_deadline,
+        "document_date": document_date,
+        "other_dates": list(other_dates),
+        # Regex fallbacks only if the LLM answered for none of the chunks
+        "analysis_tier": "llm" if any(result.get('analysis_tier') == 'llm' for result in results) else "fallback"
+    }
@@ -0,0 +1,112 @@
+# date_extraction.py
+
+import re
+from bisect import bisect_right
+
+MONTHS = [
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+]
+MONTH_NUMBERS = {name.lower(): number for number, name in enumerate(MONTHS, start=1)}
+DAYS_IN_MONTH = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+_MONTH_ALTERNATION = '|'.join(MONTHS)
+
+# One scanner for the four layouts extract_dates_from_text has always looked for:
+# YYYY-MM-DD, DD/MM/YYYY, DD Month YYYY and Month DD[,] YYYY.
+# The leading lookahead rejects positions that cannot start any of them (anything
+# but a digit or a month's first letter) before the alternation is tried.
+DATE_SCANNER = re.compile(
+    r'(?=[\dJFMASOND])(?:'
+    r'(?P<iso_y>\d{4})-(?P<iso_m>\d{2})-(?P<iso_d>\d{2})'
+    r'|(?P<dmy_d>\d{2})/(?P<dmy_m>\d{2})/(?P<dmy_y>\d{4})'
+    rf'|(?P<dmon_d>\d{{1,2}})\s(?P<dmon_m>{_MONTH_ALTERNATION})\s(?P<dmon_y>\d{{4}})'
+    rf'|(?P<mond_m>{_MONTH_ALTERNATION})\s(?P<mond_d>\d{{1,2}}),?\s(?P<mond_y>\d{{4}})'
+    r')'
+)
+
+# Full-string parser for the formats clean_date accepts:
+# %d/%m/%Y, %d-%m-%Y, %d.%m.%Y, %Y-%m-%d, %Y/%m/%d, %B %d, %Y and %d %B %Y
+DATE_PARSER = re.compile(
+    r'(?P<a_d>\d{1,2})(?P<a_sep>[/.-])(?P<a_m>\d{1,2})(?P=a_sep)(?P<a_y>\d{4})'
+    r'|(?P<b_y>\d{4})(?P<b_sep>[/-])(?P<b_m>\d{1,2})(?P=b_sep)(?P<b_d>\d{1,2})'
+    r'|(?P<c_m>[A-Za-z]+)\s+(?P<c_d>\d{1,2}),\s+(?P<c_y>\d{4})'
+    r'|(?P<d_d>\d{1,2})\s+(?P<d_m>[A-Za-z]+)\s+(?P<d_y>\d{4})'
+)
+
+# Separates documents in extract_dates_many; no pattern can match across it
+_DOCUMENT_SEPARATOR = '\x00'
+
+# lastgroup -> the (day, month, year) group names of the alternative that matched
+_GROUP_NAMES = {
+    name: tuple(f"{name.split('_')[0]}_{part}" for part in 'dmy')
+    for pattern in (DATE_SCANNER, DATE_PARSER)
+    for name in pattern.groupindex
+}
+
+def format_date(year: int, month: int, day: int) -> str:
+    """Format a date as YYYY-MM-DD, or return None if it does not exist"""
+    if year < 1 or not 1 <= month <= 12 or day < 1:
+        return None
+    leap = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    if day > DAYS_IN_MONTH[month - 1] + leap:
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+def _month_number(name: str) -> int:
+    return MONTH_NUMBERS.get(name.lower(), 0)
+
+def _from_match(match) -> str:
+    """Build the YYYY-MM-DD string for a DATE_SCANNER or DATE_PARSER match"""
+    # Exactly one alternative participates; its groups share a prefix
+    day, month, year = match.group(*_GROUP_NAMES[match.lastgroup])
+    month_number = int(month) if month.isdigit() else _month_number(month)
+    return format_date(int(year), month_number, int(day))
+
+def clean_date(date_str: str) -> str:
+    """Convert various date formats to YYYY-MM-DD (None if unparseable)"""
+    if not isinstance(date_str, str):
+        return None
+    match = DATE_PARSER.fullmatch(date_str)
+    return _from_match(match) if match else None
+
+def extract_dates(text: str) -> list:
+    """Extract unique dates (YYYY-MM-DD) from text in order of first appearance"""
+    dates = {}
+    for match in DATE_SCANNER.finditer(text):
+        date = _from_match(match)
+        if date:
+            dates[date] = None
+    return list(dates)
+
+def date_at(text: str, pos: int) -> str:
+    """The date (YYYY-MM-DD) starting exactly at pos in text, or None.
+
+    Reads the scanner's layouts and every format clean_date accepts, so a label
+    followed by e.g. 13-03-2029 or 2029/03/13 is not mistaken for an undated one.
+    """
+    for pattern in (DATE_SCANNER, DATE_PARSER):
+        match = pattern.match(text, pos)
+        date = _from_match(match) if match else None
+        if date:
+            return date
+    return None
+
+def extract_dates_many(texts: list) -> list:
+    """Extract dates from many documents with a single scan, returning one list per document"""
+    if not texts:
+        return []
+    # Offsets of each document's start within the joined text
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + 1
+    joined = _DOCUMENT_SEPARATOR.join(texts)
+
+    results = [{} for _ in texts]
+    for match in DATE_SCANNER.finditer(joined):
+        date = _from_match(match)
+        if date:
+            results[bisect_right(starts, match.start()) - 1][date] = None
+    return [list(dates) for dates in results]
@@ -0,0 +1,646 @@
+# deadline_store.py
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: a registry can only be shared by the threads of one process
+    fcntl = None
+
+if TYPE_CHECKING:
+    # pandas is imported on first use; appends and paged reads never need it
+    import pandas as pd
+
+COLUMNS = [
+    'document_id',
+    'document_name',
+    'document_type',
+    'upload_date',
+    'deadline_date',
+    'deadline_source',  # 'explicit', 'inferred', or 'unknown'
+    'confidence_level',  # 'high', 'medium', 'low'
+    'analysis_tier'  # 'fast', 'cache', 'llm' or 'fallback'
+]
+
+DOCUMENT_TYPES = ['BBBEE Certificate', 'Environmental Authorization', 'Safety Certification']
+DEADLINE_SOURCES = ['explicit', 'inferred', 'unknown']
+CONFIDENCE_LEVELS = ['high', 'medium', 'low']
+ANALYSIS_TIERS = ['fast', 'cache', 'llm', 'fallback']
+
+CATEGORY_COLUMNS = {
+    'document_type': DOCUMENT_TYPES,
+    'deadline_source': DEADLINE_SOURCES,
+    'confidence_level': CONFIDENCE_LEVELS,
+    'analysis_tier': ANALYSIS_TIERS
+}
+DATETIME_COLUMNS = ['upload_date', 'deadline_date']
+OBJECT_COLUMNS = ['document_id', 'document_name']
+
+DEFAULT_REGISTRY_PATH = os.environ.get("ASSET_LAYER_DEADLINE_REGISTRY", "RAG/data/deadline_registry")
+# Set to 1 when several processes (e.g. gunicorn workers) use the same registry directory
+DEFAULT_SHARED_REGISTRY = os.environ.get("ASSET_LAYER_SHARED_REGISTRY", "0") == "1"
+
+# On-disk layout: one append-only file per column
+FILE_DTYPES = {
+    **{name: np.dtype(np.int64) for name in DATETIME_COLUMNS},
+    **{name: np.dtype(np.int16) for name in CATEGORY_COLUMNS}
+}
+CATEGORIES_FILE = 'categories.json'
+LOCK_FILE = '.lock'
+
+# Dates are held as int64 nanoseconds since the epoch and viewed as datetime64[ns]
+NAT_NS = np.iinfo(np.int64).min
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+def to_nanoseconds(value) -> int:
+    """Convert a datetime (or None) to int64 nanoseconds, NaT for missing values"""
+    if value is None:
+        return NAT_NS
+    if type(value) is datetime and value.tzinfo is None:
+        # Plain integer arithmetic; much cheaper than a numpy/pandas scalar per row
+        return (value - EPOCH) // ONE_MICROSECOND * 1000
+    import pandas as pd
+    if value is pd.NaT:
+        return NAT_NS
+    return pd.Timestamp(value).value
+
+class Categories:
+    """Mapping between category labels and the small integer codes stored in a column"""
+
+    def __init__(self, labels: list):
+        self.labels = list(labels)
+        self.codes = {label: code for code, label in enumerate(self.labels)}
+
+    def encode(self, label) -> int:
+        """Get the code for a label, registering labels not seen before; None is -1"""
+        if label is None:
+            return -1
+        code = self.codes.get(label)
+        if code is None:
+            code = len(self.labels)
+            self.labels.append(label)
+            self.codes[label] = code
+        return code
+
+    def decode(self, code: int):
+        return self.labels[code] if code >= 0 else None
+
+class SortedIndex:
+    """(key, position) pairs kept sorted by key so range queries are binary-search slices.
+
+    New entries are buffered and merged in one searchsorted/insert pass before
+    the next query, so a burst of appends costs a single merge.
+    """
+
+    def __init__(self, keys=None, positions=None):
+        if keys is None:
+            self.keys = np.empty(0, dtype=np.int64)
+            self.positions = np.empty(0, dtype=np.int64)
+        else:
+            order = np.argsort(keys, kind='stable')
+            self.keys = np.asarray(keys, dtype=np.int64)[order]
+            self.positions = np.asarray(positions, dtype=np.int64)[order]
+        self.pending_keys = []
+        self.pending_positions = []
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self.pending_keys)
+
+    def add(self, key: int, position: int):
+        self.pending_keys.append(key)
+        self.pending_positions.append(position)
+
+    def _merge(self):
+        if not self.pending_keys:
+            return
+        keys = np.array(self.pending_keys, dtype=np.int64)
+        positions = np.array(self.pending_positions, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        keys, positions = keys[order], positions[order]
+        # side='right' keeps rows with equal keys in insertion order
+        at = np.searchsorted(self.keys, keys, side='right')
+        self.keys = np.insert(self.keys, at, keys)
+        self.positions = np.insert(self.positions, at, positions)
+        self.pending_keys = []
+        self.pending_positions = []
+
+    def range(self, low: int = None, high: int = None, include_high: bool = True,
+              after: tuple = None, limit: int = None) -> np.ndarray:
+        """Positions with low <= key <= high (or < high), in key order; missing keys are never returned.
+
+        after=(key, position) resumes just past that entry (keyset pagination) and
+        limit caps the number of positions returned.
+        """
+        self._merge()
+        if low is None:
+            start = np.searchsorted(self.keys, NAT_NS, side='right')
+        else:
+            start = np.searchsorted(self.keys, max(low, NAT_NS + 1), side='left')
+        if after is not None:
+            after_key, after_position = after
+            # Entries with equal keys are in position order, so the tie run is searchable too
+            tie_start = np.searchsorted(self.keys, after_key, side='left')
+            tie_end = np.searchsorted(self.keys, after_key, side='right')
+            resume = tie_start + np.searchsorted(
+                self.positions[tie_start:tie_end], after_position, side='right'
+            )
+            start = max(start, resume)
+        if high is None:
+            end = len(self.keys)
+        else:
+            end = np.searchsorted(self.keys, high, side='right' if include_high else 'left')
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.positions[start:max(start, end)]
+
+def column_file(directory: Path, name: str) -> Path:
+    """Path of the append-only file holding a column"""
+    if name in OBJECT_COLUMNS:
+        return directory / f"{name}.txt"
+    return directory / f"{name}.{FILE_DTYPES[name].str[1:]}"
+
+def encode_text(value) -> bytes:
+    """Encode a text cell as one newline-terminated line (None is stored as an empty line)"""
+    text = '' if value is None else str(value).replace('\n', ' ')
+    return (text + '\n').encode('utf-8')
+
+class DeadlineStore:
+    """Append-optimized columnar store for the document deadline registry.
+
+    Rows go into preallocated typed column buffers (object for ids and names,
+    int64 nanoseconds viewed as datetime64[ns] for dates, int16 category codes
+    for type/source/confidence/tier) that double in capacity when full, so appends
+    are O(1) amortized. DataFrames are only built when asked for.
+
+    Given a directory, the store is durable: every append is written ahead to
+    one append-only file per column (raw int64/int16 arrays for dates and
+    codes, newline-delimited UTF-8 for ids and names) before it is applied in
+    memory. Opening is O(1); the files are only read, with np.fromfile and a
+    single split per text column, on first access. A torn final row left by a
+    crash is truncated away on load.
+
+    Range queries on deadline_date go through sorted indexes (one overall and
+    one per document type) built on the first query, so they cost
+    O(log n + k) instead of a full scan.
+
+    With shared=True several processes can use one registry directory. Appends
+    hold an exclusive flock on the directory's lock file and first read any rows
+    other processes appended, so positions are global. Reads compare one column
+    file's size with the rows in memory and, only when it has grown, read the
+    new rows under a shared lock.
+    """
+
+    def __init__(self, path: str = None, initial_capacity: int = 1024, fsync: bool = False,
+                 shared: bool = DEFAULT_SHARED_REGISTRY):
+        self.lock = threading.RLock()
+        self.path = Path(path) if path else None
+        self.fsync = fsync
+        self.shared = shared and self.path is not None
+        if self.shared and fcntl is None:
+            raise RuntimeError("A shared deadline registry needs fcntl file locks (POSIX only)")
+        self.lock_file = None
+        self.file_locked = False
+        self.handles = {}
+        # Bytes of each text column file already read into memory
+        self.text_offsets = {name: 0 for name in OBJECT_COLUMNS}
+        self.loaded = self.path is None
+        self.size = 0
+        self.capacity = max(1, initial_capacity)
+        self.categories = {name: Categories(labels) for name, labels in CATEGORY_COLUMNS.items()}
+        self.columns = {}
+        for name in OBJECT_COLUMNS:
+            self.columns[name] = np.empty(self.capacity, dtype=object)
+        for name in DATETIME_COLUMNS:
+            self.columns[name] = np.full(self.capacity, NAT_NS, dtype=np.int64)
+        for name in CATEGORY_COLUMNS:
+            self.columns[name] = np.full(self.capacity, -1, dtype=np.int16)
+        # Built on the first range query, then maintained on append
+        self.deadline_index = None
+        self.type_indexes = None
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        with self.lock:
+            if not self.loaded:
+                return self._persisted_rows()
+            # A shared registry may have grown in another process
+            self._ensure_loaded()
+            return self.size
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def _persisted_rows(self) -> int:
+        """Row count from file sizes alone, without reading the registry"""
+        counts = []
+        for name, dtype in FILE_DTYPES.items():
+            file = column_file(self.path, name)
+            # Columns added after the registry was created are backfilled on load
+            if file.exists():
+                counts.append(file.stat().st_size // dtype.itemsize)
+        return min(counts) if counts else 0
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool = False):
+        """Hold the cross-process registry lock; a no-op unless shared or when already held.
+
+        Callers hold self.lock, so file_locked is only touched by one thread at a time.
+        """
+        if not self.shared or self.file_locked:
+            yield
+            return
+        if self.lock_file is None:
+            self.lock_file = open(self.path / LOCK_FILE, 'a+b')
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        self.file_locked = True
+        try:
+            yield
+        finally:
+            self.file_locked = False
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+
+    def _ensure_loaded(self):
+        """Read the persisted columns into memory the first time they are needed.
+
+        For a shared registry, also pick up rows appended by other processes since.
+        """
+        if self.loaded:
+            if self.shared and self._stale():
+                with self._file_lock():
+                    self._catch_up()
+            return
+        # Exclusive, since loading may truncate a torn row
+        with self._file_lock(exclusive=True):
+            self._load()
+
+    def _read_categories(self):
+        categories_file = self.path / CATEGORIES_FILE
+        if categories_file.exists():
+            with open(categories_file, 'r') as file:
+                saved = json.load(file)
+            self.categories = {
+                name: Categories(saved.get(name, labels)) for name, labels in CATEGORY_COLUMNS.items()
+            }
+
+    def _file_size(self, name: str) -> int:
+        try:
+            return column_file(self.path, name).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _stale(self) -> bool:
+        """Whether another process has appended since the last read (a single stat call)"""
+        return self._file_size('deadline_date') > self.size * FILE_DTYPES['deadline_date'].itemsize
+
+    def _catch_up(self):
+        """Read the complete rows other processes appended after the ones in memory"""
+        rows = min(self._file_size(name) // dtype.itemsize for name, dtype in FILE_DTYPES.items()) - self.size
+        lines = {}
+        for name in OBJECT_COLUMNS:
+            if rows <= 0:
+                return
+            with open(column_file(self.path, name), 'rb') as file:
+                file.seek(self.text_offsets[name])
+                # A torn final line from a crashed writer is left out
+                lines[name] = file.read().split(b'\n')[:-1]
+            rows = min(rows, len(lines[name]))
+        if rows <= 0:
+            return
+
+        # Other processes may have registered new category labels with their rows
+        self._read_categories()
+        if self.size + rows > self.capacity:
+            self._grow(self.size + rows)
+        start, end = self.size, self.size + rows
+        for name, dtype in FILE_DTYPES.items():
+            self.columns[name][start:end] = np.fromfile(
+                column_file(self.path, name), dtype=dtype, count=rows, offset=start * dtype.itemsize
+            )
+        for name in OBJECT_COLUMNS:
+            new_lines = lines[name][:rows]
+            self.columns[name][start:end] = [line.decode('utf-8') or None for line in new_lines]
+            self.text_offsets[name] += sum(len(line) + 1 for line in new_lines)
+        self.size = end
+        if self.deadline_index is not None:
+            for position in range(start, end):
+                self._index_row(
+                    position, int(self.columns['deadline_date'][position]), int(self.columns['document_type'][position])
+                )
+
+    def _repair_tail(self):
+        """Cut a torn row left by a crashed writer off every column file (exclusive lock held)"""
+        lengths = {name: self.size * dtype.itemsize for name, dtype in FILE_DTYPES.items()}
+        lengths.update(self.text_offsets)
+        for name, length in lengths.items():
+            if self._file_size(name) > length:
+                self._handle(name).truncate(length)
+                print(f"Truncated torn row from {column_file(self.path, name)}")
+
+    def _load(self):
+        self._read_categories()
+
+        data = {}
+        missing = []
+        for name, dtype in FILE_DTYPES.items():
+            file = column_file(self.path, name)
+            if file.exists():
+                data[name] = np.fromfile(file, dtype=dtype)
+            else:
+                missing.append(name)
+        for name in OBJECT_COLUMNS:
+            file = column_file(self.path, name)
+            # The last element is '' after a complete final line, or a torn partial line
+            data[name] = file.read_bytes().decode('utf-8').split('\n')[:-1] if file.exists() else []
+
+        size = min(len(values) for values in data.values())
+        self._truncate_files(data, size)
+        for name in missing:
+            data[name] = self._backfill(name, size)
+
+        self.capacity = max(self.capacity, size)
+        for name, values in data.items():
+            if name in OBJECT_COLUMNS:
+                column = np.empty(self.capacity, dtype=object)
+                column[:size] = [value if value else None for value in values[:size]]
+            else:
+                column = np.empty(self.capacity, dtype=FILE_DTYPES[name])
+                column[:size] = values[:size]
+            self.columns[name] = column
+        for name in OBJECT_COLUMNS:
+            self.text_offsets[name] = self._file_size(name)
+        self.size = size
+        self.loaded = True
+
+    def _truncate_files(self, data: dict, size: int):
+        """Cut every column file back to the last complete row"""
+        for name, values in data.items():
+            file = column_file(self.path, name)
+            if not file.exists():
+                continue
+            if name in OBJECT_COLUMNS:
+                if len(values) == size and file.read_bytes().endswith(b'\n'):
+                    continue
+                length = sum(len(encode_text(value)) for value in values[:size])
+            else:
+                length = size * FILE_DTYPES[name].itemsize
+            if file.stat().st_size != length:
+                with open(file, 'r+b') as handle:
+                    handle.truncate(length)
+                print(f"Truncated torn row from {file}")
+
+    def _backfill(self, name: str, size: int) -> np.ndarray:
+        """Create the file of a column added after the registry was written, with missing values"""
+        fill = NAT_NS if name in DATETIME_COLUMNS else -1
+        values = np.full(size, fill, dtype=FILE_DTYPES[name])
+        if size:
+            values.tofile(column_file(self.path, name))
+            print(f"Added column {name} to the deadline registry")
+        return values
+
+    def _handle(self, name: str):
+        handle = self.handles.get(name)
+        if handle is None:
+            handle = open(column_file(self.path, name), 'ab')
+            self.handles[name] = handle
+        return handle
+
+    def _save_categories(self):
+        """Atomically rewrite the category labels (only when a new label appears)"""
+        tmp_file = self.path / (CATEGORIES_FILE + '.tmp')
+        with open(tmp_file, 'w') as file:
+            json.dump({name: categories.labels for name, categories in self.categories.items()}, file)
+        os.replace(tmp_file, self.path / CATEGORIES_FILE)
+
+    def _write_ahead(self, encoded: dict):
+        """Append an encoded row to the column files"""
+        for name, dtype in FILE_DTYPES.items():
+            self._handle(name).write(np.array(encoded[name], dtype=dtype).tobytes())
+        for name in OBJECT_COLUMNS:
+            line = encode_text(encoded[name])
+            self._handle(name).write(line)
+            self.text_offsets[name] += len(line)
+        for handle in self.handles.values():
+            handle.flush()
+            if self.fsync:
+                os.fsync(handle.fileno())
+
+    def close(self):
+        """Close the column files"""
+        with self.lock:
+            for handle in self.handles.values():
+                handle.close()
+            self.handles = {}
+            if self.lock_file is not None:
+                self.lock_file.close()
+                self.lock_file = None
+
+    def _grow(self, min_capacity: int):
+        """Double the column buffers until they hold min_capacity rows"""
+        capacity = self.capacity
+        while capacity < min_capacity:
+            capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+        self.capacity = capacity
+
+    def _encode_row(self, row: dict) -> dict:
+        encoded = {name: row.get(name) for name in OBJECT_COLUMNS}
+        for name in DATETIME_COLUMNS:
+            encoded[name] = to_nanoseconds(row.get(name))
+        new_label = False
+        for name, categories in self.categories.items():
+            known = len(categories.labels)
+            encoded[name] = categories.encode(row.get(name))
+            new_label = new_label or len(categories.labels) != known
+        if new_label and self.path is not None:
+            self._save_categories()
+        return encoded
+
+    def append(self, row: dict, make_id=None) -> int:
+        """Append a row given as a dict keyed by column name, returning its position.
+
+        make_id(position), if given, sets row['document_id'] while the position is
+        reserved, so ids derived from it are unique across processes sharing the registry.
+        """
+        with self.lock, self._file_lock(exclusive=True):
+            self._ensure_loaded()
+            if self.shared:
+                self._repair_tail()
+            if make_id is not None:
+                row['document_id'] = make_id(self.size)
+            encoded = self._encode_row(row)
+            if self.path is not None:
+                self._write_ahead(encoded)
+            if self.size == self.capacity:
+                self._grow(self.size + 1)
+            position = self.size
+            for name, value in encoded.items():
+                self.columns[name][position] = value
+            self.size += 1
+            if self.deadline_index is not None:
+                self._index_row(position, encoded['deadline_date'], encoded['document_type'])
+            return position
+
+    def extend(self, rows: list):
+        """Append many rows at once"""
+        with self.lock, self._file_lock(exclusive=True):
+            self._ensure_loaded()
+            if self.size + len(rows) > self.capacity:
+                self._grow(self.size + len(rows))
+            for row in rows:
+                self.append(row)
+
+    def column(self, name: str) -> np.ndarray:
+        """Get a read-only view of the filled part of a column (dates as datetime64[ns])"""
+        with self.lock:
+            self._ensure_loaded()
+            view = self.columns[name][:self.size]
+        if name in DATETIME_COLUMNS:
+            view = view.view('datetime64[ns]')
+        view.flags.writeable = False
+        return view
+
+    def row(self, position: int) -> dict:
+        """Get a single row as a dict of plain Python values"""
+        with self.lock:
+            self._ensure_loaded()
+            if not 0 <= position < self.size:
+                raise IndexError(position)
+            record = {name: self.columns[name][position] for name in OBJECT_COLUMNS}
+            for name in DATETIME_COLUMNS:
+                value = int(self.columns[name][position])
+                record[name] = None if value == NAT_NS else EPOCH + timedelta(microseconds=value // 1000)
+            for name, categories in self.categories.items():
+                record[name] = categories.decode(int(self.columns[name][position]))
+        return {name: record[name] for name in COLUMNS}
+
+    def to_frame(self, positions=None) -> 'pd.DataFrame':
+        """Build a DataFrame of all rows, or of the rows at the given positions"""
+        import pandas as pd
+        with self.lock:
+            self._ensure_loaded()
+            if positions is None:
+                data = {name: column[:self.size].copy() for name, column in self.columns.items()}
+            else:
+                positions = np.asarray(positions, dtype=np.int64)
+                data = {name: column[positions] for name, column in self.columns.items()}
+            labels = {name: list(categories.labels) for name, categories in self.categories.items()}
+
+        for name in DATETIME_COLUMNS:
+            data[name] = data[name].view('datetime64[ns]')
+        for name in CATEGORY_COLUMNS:
+            data[name] = pd.Categorical.from_codes(data[name], categories=labels[name])
+        index = None if positions is None else pd.Index(positions)
+        return pd.DataFrame({name: data[name] for name in COLUMNS}, index=index)
+
+    def _build_indexes(self):
+        """Sort the deadline column into the overall and per-type indexes"""
+        deadlines = self.columns['deadline_date'][:self.size]
+        types = self.columns['document_type'][:self.size]
+        positions = np.arange(self.size, dtype=np.int64)
+        self.deadline_index = SortedIndex(deadlines, positions)
+        self.type_indexes = {}
+        for code in np.unique(types):
+            mask = types == code
+            self.type_indexes[int(code)] = SortedIndex(deadlines[mask], positions[mask])
+
+    def _index_row(self, position: int, deadline: int, type_code: int):
+        self.deadline_index.add(deadline, position)
+        index = self.type_indexes.get(type_code)
+        if index is None:
+            index = self.type_indexes[type_code] = SortedIndex()
+        index.add(deadline, position)
+
+    def positions_between(self, start=None, end=None, document_type: str = None,
+                          include_end: bool = True, after: tuple = None,
+                          limit: int = None) -> np.ndarray:
+        """Positions of rows whose deadline falls in [start, end] (or [start, end)), in deadline order.
+
+        Either bound may be None for an open range; rows without a deadline are
+        never returned. With document_type, only that type's index is searched.
+        after=(deadline_ns, position) and limit select one page of the result.
+        """
+        with self.lock:
+            self._ensure_loaded()
+            if self.deadline_index is None:
+                self._build_indexes()
+            if document_type is None:
+                index = self.deadline_index
+            else:
+                code = self.categories['document_type'].codes.get(document_type)
+                index = self.type_indexes.get(code) if code is not None else None
+                if index is None:
+                    return np.empty(0, dtype=np.int64)
+            low = None if start is None else to_nanoseconds(start)
+            high = None if end is None else to_nanoseconds(end)
+            return index.range(low, high, include_end, after, limit).copy()
+
+    def deadlines_between(self, start=None, end=None, document_type: str = None,
+                          include_end: bool = True) -> 'pd.DataFrame':
+        """DataFrame of rows with deadlines in a range, sorted by deadline"""
+        return self.to_frame(self.positions_between(start, end, document_type, include_end))
+
+    def positions_after(self, after: int = None, limit: int = None, document_type: str = None) -> np.ndarray:
+        """Positions in insertion order following position `after`, optionally of one type"""
+        with self.lock:
+            self._ensure_loaded()
+            start = 0 if after is None else after + 1
+            if document_type is None:
+                end = self.size if limit is None else min(self.size, start + limit)
+                return np.arange(start, max(start, end), dtype=np.int64)
+            code = self.categories['document_type'].codes.get(document_type)
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            if limit is None:
+                return np.flatnonzero(self.columns['document_type'][start:self.size] == code) + start
+            # Scan forward in blocks so a page costs about O(k) rather than O(n)
+            found = []
+            count = 0
+            block = max(4 * limit, 4096)
+            while start < self.size and count < limit:
+                stop = min(self.size, start + block)
+                matches = np.flatnonzero(self.columns['document_type'][start:stop] == code) + start
+                found.append(matches[:limit - count])
+                count += len(found[-1])
+                start = stop
+            return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def records(self, positions, fields: list = None) -> list:
+        """Rows at the given positions as dicts of plain Python values, optionally projected"""
+        fields = fields or COLUMNS
+        with self.lock:
+            self._ensure_loaded()
+            positions = np.asarray(positions, dtype=np.int64)
+            values = {}
+            for name in fields:
+                column = self.columns[name][positions]
+                if name in DATETIME_COLUMNS:
+                    values[name] = [
+                        None if value == NAT_NS else EPOCH + timedelta(microseconds=value // 1000)
+                        for value in column.tolist()
+                    ]
+                elif name in CATEGORY_COLUMNS:
+                    labels = self.categories[name].labels
+                    values[name] = [labels[code] if code >= 0 else None for code in column.tolist()]
+                else:
+                    values[name] = column.tolist()
+        return [dict(zip(fields, row)) for row in zip(*(values[name] for name in fields))]
+
+    def deadline_key(self, position: int) -> tuple:
+        """The (deadline_ns, position) index key of a row, used as a pagination cursor"""
+        with self.lock:
+            self._ensure_loaded()
+            return int(self.columns['deadline_date'][position]), position
@@ -0,0 +1,72 @@
+# ingest_manifest.py
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+DEFAULT_MANIFEST_PATH = "RAG/data/ingest_manifest.json"
+
+def hash_file(file_path: str) -> str:
+    """Return the sha256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def manifest_key(file_path: str) -> str:
+    """Normalise a file path so the same file maps to one manifest entry"""
+    return str(Path(file_path).resolve())
+
+class IngestManifest:
+    """Record of ingested files: content hash and the vector store ids of their chunks"""
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as file:
+                    self.entries = json.load(file).get('files', {})
+            except Exception as e:
+                print(f"Error reading manifest {self.path}, starting empty: {str(e)}")
+                self.entries = {}
+
+    def get(self, file_path: str) -> dict:
+        """Get the manifest entry for a file, or None if it was never ingested"""
+        return self.entries.get(manifest_key(file_path))
+
+    def is_unchanged(self, file_path: str, content_hash: str) -> bool:
+        """Check whether a file was already ingested with the same content"""
+        entry = self.get(file_path)
+        return entry is not None and entry.get('hash') == content_hash
+
+    def update(self, file_path: str, content_hash: str, chunk_ids: list):
+        """Record the content hash and chunk ids of an ingested file"""
+        self.entries[manifest_key(file_path)] = {'hash': content_hash, 'chunk_ids': list(chunk_ids)}
+
+    def remove(self, file_path: str) -> list:
+        """Drop a file from the manifest, returning its chunk ids"""
+        entry = self.entries.pop(manifest_key(file_path), None)
+        return entry.get('chunk_ids', []) if entry else []
+
+    def clear(self):
+        """Forget every file (used when the collection is rebuilt from scratch)"""
+        self.entries = {}
+
+    def missing_under(self, directory: str, present: set) -> list:
+        """List manifest paths directly inside a directory that are no longer present on disk"""
+        root = manifest_key(directory)
+        return [
+            key for key in self.entries
+            if str(Path(key).parent) == root and key not in present
+        ]
+
+    def save(self):
+        """Atomically write the manifest to disk"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w') as file:
+            json.dump({'version': 1, 'files': self.entries}, file)
+        os.replace(tmp_path, self.path)
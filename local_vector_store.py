@@ -0,0 +1,283 @@
+# local_vector_store.py
+
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+DEFAULT_LOCAL_STORE_PATH = "RAG/data/vector_store"
+EMBEDDINGS_FILE = "embeddings.f32"
+METADATA_FILE = "metadata.jsonl"
+DELETED_FILE = "deleted.txt"
+INFO_FILE = "info.json"
+
+# Rows scored per matrix multiply, bounding the temporary score matrix
+SEARCH_BLOCK_ROWS = 65_536
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length so cosine similarity is a dot product"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+class LocalVectorStore(VectorStore):
+    """In-process vector store: unit-normalized float32 embeddings in a memory-mapped file.
+
+    Rows are appended to a raw float32 file that is memory-mapped for search,
+    with ids, texts and metadata in a JSON-lines sidecar (one line per row).
+    Deleted rows are masked out and dropped by compact(). Top-k is a blocked
+    matrix multiply followed by argpartition, and similarity_search_by_vectors
+    scores a whole batch of queries in the same pass. A metadata filter
+    (equality, or {"$in": [...]}) restricts the multiply to the matching rows.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOCAL_STORE_PATH, embedding_function: Embeddings = None,
+                 pre_delete_collection: bool = False):
+        self.path = Path(path)
+        self.embedding_function = embedding_function
+        self.lock = threading.RLock()
+        self.path.mkdir(parents=True, exist_ok=True)
+        if pre_delete_collection:
+            for name in (EMBEDDINGS_FILE, METADATA_FILE, DELETED_FILE, INFO_FILE):
+                (self.path / name).unlink(missing_ok=True)
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_function
+
+    def _load(self):
+        """Read the sidecar files and map the embeddings, dropping a torn final row"""
+        info_file = self.path / INFO_FILE
+        self.dim = json.loads(info_file.read_text())['dim'] if info_file.exists() else None
+        self.records = []
+        metadata_file = self.path / METADATA_FILE
+        if metadata_file.exists():
+            with open(metadata_file, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        self.records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+
+        rows = 0
+        torn = False
+        embeddings_file = self.path / EMBEDDINGS_FILE
+        if self.dim and embeddings_file.exists():
+            rows, remainder = divmod(embeddings_file.stat().st_size, 4 * self.dim)
+            torn = remainder != 0
+        size = min(rows, len(self.records))
+        if torn or size != rows or size != len(self.records):
+            self._truncate(size)
+
+        self.deleted = np.zeros(size, dtype=bool)
+        deleted_file = self.path / DELETED_FILE
+        if deleted_file.exists():
+            positions = [int(line) for line in deleted_file.read_text().split()]
+            self.deleted[[p for p in positions if p < size]] = True
+        self.positions = {
+            record['id']: position for position, record in enumerate(self.records)
+            if not self.deleted[position]
+        }
+        self.columns = {}
+        self._map()
+
+    def _truncate(self, size: int):
+        print(f"Truncated torn rows from {self.path}")
+        self.records = self.records[:size]
+        if self.dim:
+            with open(self.path / EMBEDDINGS_FILE, 'r+b') as file:
+                file.truncate(size * 4 * self.dim)
+        self._rewrite_metadata()
+
+    def _rewrite_metadata(self):
+        tmp_file = self.path / (METADATA_FILE + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as file:
+            for record in self.records:
+                file.write(json.dumps(record) + '\n')
+        os.replace(tmp_file, self.path / METADATA_FILE)
+
+    def _map(self):
+        """(Re)map the embeddings file read-only"""
+        if self.records:
+            self.matrix = np.memmap(
+                self.path / EMBEDDINGS_FILE, dtype=np.float32, mode='r', shape=(len(self.records), self.dim)
+            )
+        else:
+            self.matrix = np.empty((0, self.dim or 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add_embeddings(self, texts: list, embeddings: list, metadatas: list = None, ids: list = None) -> list:
+        """Append pre-computed embeddings; an id that already exists replaces the old row"""
+        vectors = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        with self.lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                (self.path / INFO_FILE).write_text(json.dumps({'dim': self.dim}))
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional embeddings, got {vectors.shape[1]}")
+            self.delete([doc_id for doc_id in ids if doc_id in self.positions])
+
+            # Vectors first: a crash between the two writes leaves rows without
+            # metadata, which _load truncates
+            with open(self.path / EMBEDDINGS_FILE, 'ab') as file:
+                file.write(vectors.tobytes())
+            with open(self.path / METADATA_FILE, 'a', encoding='utf-8') as file:
+                for doc_id, text, metadata in zip(ids, texts, metadatas):
+                    file.write(json.dumps({'id': doc_id, 'text': text, 'metadata': metadata or {}}) + '\n')
+
+            start = len(self.records)
+            for offset, (doc_id, text, metadata) in enumerate(zip(ids, texts, metadatas)):
+                self.records.append({'id': doc_id, 'text': text, 'metadata': metadata or {}})
+                self.positions[doc_id] = start + offset
+            self.deleted = np.concatenate([self.deleted, np.zeros(len(ids), dtype=bool)])
+            self.columns = {}
+            self._map()
+        return list(ids)
+
+    def add_texts(self, texts, metadatas: list = None, *, ids: list = None, **kwargs) -> list:
+        texts = list(texts)
+        return self.add_embeddings(texts, self.embedding_function.embed_documents(texts), metadatas, ids)
+
+    def delete(self, ids: list = None, **kwargs) -> bool:
+        """Mask out rows by id, compacting the files once most rows are deleted"""
+        if not ids:
+            return True
+        with self.lock:
+            positions = [self.positions.pop(doc_id) for doc_id in ids if doc_id in self.positions]
+            if positions:
+                self.deleted[positions] = True
+                with open(self.path / DELETED_FILE, 'a') as file:
+                    file.write(''.join(f"{position}\n" for position in positions))
+                if self.deleted.sum() > len(self.positions):
+                    self.compact()
+        return True
+
+    def compact(self):
+        """Rewrite the files without deleted rows"""
+        with self.lock:
+            keep = np.flatnonzero(~self.deleted)
+            if len(keep) == len(self.records):
+                return
+            vectors = np.array(self.matrix[keep]) if len(keep) else np.empty((0, self.dim), dtype=np.float32)
+            self.records = [self.records[position] for position in keep]
+            tmp_file = self.path / (EMBEDDINGS_FILE + '.tmp')
+            vectors.tofile(tmp_file)
+            # Drop the map before replacing the file underneath it
+            self.matrix = None
+            os.replace(tmp_file, self.path / EMBEDDINGS_FILE)
+            self._rewrite_metadata()
+            (self.path / DELETED_FILE).unlink(missing_ok=True)
+            self.deleted = np.zeros(len(self.records), dtype=bool)
+            self.positions = {record['id']: position for position, record in enumerate(self.records)}
+            self.columns = {}
+            self._map()
+
+    def _column(self, key: str) -> np.ndarray:
+        """One metadata key's values for every row, built on first use and kept until the rows change"""
+        column = self.columns.get(key)
+        if column is None:
+            column = np.empty(len(self.records), dtype=object)
+            column[:] = [record['metadata'].get(key) for record in self.records]
+            self.columns[key] = column
+        return column
+
+    def _candidates(self, filter: dict = None):
+        """Positions of the live rows matching filter, or None without a filter"""
+        if not filter:
+            return None
+        mask = ~self.deleted
+        for key, expected in filter.items():
+            column = self._column(key)
+            if isinstance(expected, dict) and '$in' in expected:
+                mask &= np.isin(column, list(expected['$in']))
+            else:
+                mask &= column == expected
+        return np.flatnonzero(mask)
+
+    def search_by_vectors(self, embeddings, k: int = 4, filter: dict = None) -> list:
+        """Top-k (position, cosine similarity) pairs for each query embedding"""
+        queries = normalize_rows(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        with self.lock:
+            matrix = self.matrix
+            deleted = self.deleted
+            candidates = self._candidates(filter)
+        rows = len(matrix) if candidates is None else len(candidates)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_positions = np.zeros((len(queries), 0), dtype=np.int64)
+
+        for start in range(0, rows, SEARCH_BLOCK_ROWS):
+            # Contiguous slices of the map when unfiltered; only the partition's rows otherwise
+            if candidates is None:
+                block_positions = np.arange(start, min(start + SEARCH_BLOCK_ROWS, rows))
+                scores = queries @ matrix[start:start + SEARCH_BLOCK_ROWS].T
+                scores[:, deleted[start:start + SEARCH_BLOCK_ROWS]] = -np.inf
+            else:
+                block_positions = candidates[start:start + SEARCH_BLOCK_ROWS]
+                scores = queries @ matrix[block_positions].T
+            # Keep the block's top k, then merge with the best so far
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                positions = block_positions[top]
+                scores = np.take_along_axis(scores, top, axis=1)
+            else:
+                positions = np.broadcast_to(block_positions, scores.shape)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_positions = np.concatenate([best_positions, positions], axis=1)
+            if best_scores.shape[1] > k:
+                top = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, top, axis=1)
+                best_positions = np.take_along_axis(best_positions, top, axis=1)
+
+        results = []
+        order = np.argsort(-best_scores, axis=1)
+        for row, columns in enumerate(order):
+            results.append([
+                (int(best_positions[row, column]), float(best_scores[row, column]))
+                for column in columns if best_scores[row, column] > -np.inf
+            ])
+        return results
+
+    def _document(self, position: int) -> Document:
+        record = self.records[position]
+        return Document(id=record['id'], page_content=record['text'], metadata=dict(record['metadata']))
+
+    def similarity_search_by_vectors(self, embeddings, k: int = 4, filter: dict = None) -> list:
+        """Batched search: one list of documents per query embedding"""
+        return [
+            [self._document(position) for position, _ in hits]
+            for hits in self.search_by_vectors(embeddings, k, filter)
+        ]
+
+    def similarity_search_with_score_by_vector(self, embedding, k: int = 4, filter: dict = None) -> list:
+        """Documents with their cosine distance (lower is closer), like PGVector"""
+        hits = self.search_by_vectors([embedding], k, filter)[0]
+        return [(self._document(position), 1.0 - score) for position, score in hits]
+
+    def similarity_search_by_vector(self, embedding, k: int = 4, filter: dict = None, **kwargs) -> list:
+        return self.similarity_search_by_vectors([embedding], k, filter)[0]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: dict = None, **kwargs) -> list:
+        return self.similarity_search_with_score_by_vector(self.embedding_function.embed_query(query), k, filter)
+
+    def similarity_search(self, query: str, k: int = 4, filter: dict = None, **kwargs) -> list:
+        return self.similarity_search_by_vector(self.embedding_function.embed_query(query), k, filter)
+
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance
+
+    @classmethod
+    def from_texts(cls, texts: list, embedding: Embeddings, metadatas: list = None, *, ids: list = None,
+                   path: str = DEFAULT_LOCAL_STORE_PATH, **kwargs):
+        store = cls(path, embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
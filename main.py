@@ -1,5 +1,7 @@
 from deadline_manager import DocumentDeadlineManager
+from metrics import METRICS
 from pathlib import Path
+import argparse
 
 def read_document(file_path):
     """Read document content from file"""
@@ -10,7 +12,16 @@ def read_document(file_path):
         print(f"Error reading file {file_path}: {str(e)}")
         return None
 
+def print_metrics():
+    """Per-stage timings so far, to see whether time goes to Postgres, TGI or parsing"""
+    print("\nStage timings:")
+    print(METRICS.format_summary())
+
 def main():
+    parser = argparse.ArgumentParser(description='Document Deadline Analyzer')
+    parser.add_argument('--metrics', action='store_true', help='Print per-stage timings after each analysis')
+    args = parser.parse_args()
+    
     print("Document Deadline Analyzer")
     print("-" * 30)
     
@@ -20,12 +31,13 @@ def main():
     while True:
         print("\nOptions:")
         print("1. Analyze a document")
-        print("2. View all deadlines")
-        print("3. View upcoming deadlines")
-        print("4. View expired deadlines")
-        print("5. Exit")
+        print("2. Analyze all documents in a directory")
+        print("3. View all deadlines")
+        print("4. View upcoming deadlines")
+        print("5. View expired deadlines")
+        print("6. Exit")
         
-        choice = input("\nEnter your choice (1-5): ")
+        choice = input("\nEnter your choice (1-6): ")
         
         if choice == "1":
             # Get document path from user
@@ -41,8 +53,37 @@ def main():
             content = read_document(file_path)
             if content:
                 manager.process_new_document(content, Path(file_path).name)
+                if args.metrics:
+                    print_metrics()
                 
         elif choice == "2":
+            directory = input("\nEnter the path to the directory: ")
+            if not Path(directory).is_dir():
+                print(f"Error: Directory {directory} does not exist")
+                continue
+            
+            txt_files = sorted(Path(directory).glob("*.txt"))
+            if not txt_files:
+                print(f"No text files found in {directory}")
+                continue
+            
+            concurrency = input("Number of documents to analyze concurrently (default 8): ")
+            concurrency = int(concurrency) if concurrency.isdigit() and int(concurrency) > 0 else 8
+            
+            # Files are read lazily as the scheduler has capacity for them
+            documents = ((path.name, read_document(path)) for path in txt_files)
+            analyzed = 0
+            for document_name, row in manager.process_documents(
+                ((name, content) for name, content in documents if content),
+                concurrency=concurrency
+            ):
+                analyzed += 1
+                status = "deadline stored" if row else "no deadline determined"
+                print(f"[{analyzed}/{len(txt_files)}] {document_name}: {status}")
+            if args.metrics:
+                print_metrics()
+                
+        elif choice == "3":
             deadlines = manager.get_all_deadlines()
             if deadlines.empty:
                 print("\nNo deadlines stored yet")
@@ -50,7 +91,7 @@ def main():
                 print("\nAll Deadlines:")
                 print(deadlines)
                 
-        elif choice == "3":
+        elif choice == "4":
             days = input("\nEnter number of days to look ahead (default 30): ")
             days = int(days) if days.isdigit() else 30
             
@@ -61,7 +102,7 @@ def main():
                 print(f"\nUpcoming Deadlines (next {days} days):")
                 print(deadlines)
                 
-        elif choice == "4":
+        elif choice == "5":
             deadlines = manager.get_expired_deadlines()
             if deadlines.empty:
                 print("\nNo expired deadlines")
@@ -69,7 +110,7 @@ def main():
                 print("\nExpired Deadlines:")
                 print(deadlines)
                 
-        elif choice == "5":
+        elif choice == "6":
             print("\nExiting program...")
             break
             
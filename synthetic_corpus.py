@@ -0,0 +1,474 @@
+# synthetic_corpus.py
+"""Seeded generator of synthetic certificates with ground-truth deadline labels.
+
+Documents follow the layouts of the RAG/data/test-documents templates: clear,
+less explicit, minimal, multiple-date, amended, conditional, multi-phase,
+multi-certificate and system-specific variants of BBBEE certificates,
+Environmental Authorizations and Safety Certifications. Company names,
+reference numbers, dates and the date format (any format clean_date accepts)
+are randomized. Document i depends only on (seed, i), so any slice of a corpus
+can be regenerated or produced in parallel.
+
+Expected deadlines follow DocumentDeadlineManager's rules: the stated expiry
+when there is one, else the document date plus the type's renewal period.
+Documents with neither are labelled 'none'; the manager falls back to the
+upload date for them, so they have no fixed expected deadline.
+
+Write a corpus to disk (labels go to labels.jsonl next to the documents):
+    python synthetic_corpus.py --count 100000 --output RAG/data/synthetic [--seed 0]
+or stream one straight into the vector store:
+    python load_documents.py --synthetic 1000000 [--seed 0]
+"""
+
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from deadline_manager import DOCUMENT_PATTERNS
+
+DEFAULT_SEED = 0
+LABELS_FILE = "labels.jsonl"
+
+# The formats clean_date accepts
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%B %d, %Y', '%d %B %Y', '%Y/%m/%d', '%d-%m-%Y', '%d.%m.%Y')
+FIRST_ISSUE = date(2019, 1, 1)
+ISSUE_SPAN_DAYS = 9 * 365
+
+COMPANY_PREFIXES = [
+    'Sunrise', 'Green', 'EcoSmart', 'PowerFlow', 'SunTech', 'Blue Horizon', 'Karoo', 'Maritime', 'Delta',
+    'Highveld', 'Cape', 'Summit', 'Ubuntu', 'Amandla', 'Lowveld', 'Atlantic', 'Zenith', 'Savanna'
+]
+COMPANY_CORES = ['Energy', 'Solar', 'Power', 'Renewables', 'Wind', 'Grid', 'Utilities', 'Hydro', 'Generation']
+COMPANY_SUFFIXES = ['Solutions', 'Holdings', 'Innovations', 'Developments', 'Technologies', 'Partners', 'Group']
+LEGAL_FORMS = ['(Pty) Ltd', 'Ltd', '(Pty) Ltd', 'Inc.', '']
+LOCATIONS = [
+    'Northern Cape Province', 'Eastern Cape Province', 'Western Cape Province', 'Limpopo Province',
+    'Mpumalanga Province', 'KwaZulu-Natal Province', 'Free State Province', 'Gauteng Province'
+]
+AGENCIES = ['BEE Verify Pro', 'Compliance Partners', 'BEE Assessment Corp', 'BEE Compliance Solutions', 'Empower Ratings']
+SYSTEMS = ['Fire Suppression System', 'High Voltage Switchgear', 'Pressure Vessel Array', 'Emergency Lighting', 'Lifting Equipment']
+NUMBER_WORDS = {6: 'Six', 12: 'Twelve', 18: 'Eighteen', 24: 'Twenty-four', 36: 'Thirty-six'}
+
+def add_months(start: date, months: int) -> date:
+    month = start.month - 1 + months
+    year = start.year + month // 12
+    month = month % 12 + 1
+    day = min(start.day, [31, 29 if year % 4 == 0 and (year % 100 or year % 400 == 0) else 28,
+                          31, 30, 31, 30, 31, 31, 30, 31, 30, 31][month - 1])
+    return date(year, month, day)
+
+def expiry_after(issue: date, months: int) -> date:
+    """Last day of a validity period of months starting on issue"""
+    return add_months(issue, months) - timedelta(days=1)
+
+class _Document:
+    """Random choices for one document, plus the ground truth accumulated while writing it"""
+
+    def __init__(self, rng: random.Random, document_type: str):
+        self.rng = rng
+        self.document_type = document_type
+        self.date_format = rng.choice(DATE_FORMATS)
+        self.issue = FIRST_ISSUE + timedelta(days=rng.randrange(ISSUE_SPAN_DAYS))
+        self.company = ' '.join(part for part in (
+            rng.choice(COMPANY_PREFIXES), rng.choice(COMPANY_CORES), rng.choice(COMPANY_SUFFIXES),
+            rng.choice(LEGAL_FORMS)
+        ) if part)
+        self.registration = f"{rng.randint(2000, 2023)}/{rng.randrange(10 ** 6):06d}/07"
+        self.explicit_deadline = None
+        self.document_date = None
+        self.expected_deadline = None
+        self.deadline_source = 'none'
+
+    def fmt(self, value: date) -> str:
+        # Mostly the document's own format, sometimes another, as in real scans
+        date_format = self.date_format if self.rng.random() < 0.85 else self.rng.choice(DATE_FORMATS)
+        return value.strftime(date_format)
+
+    def reference(self, prefix: str) -> str:
+        return f"{prefix}/{self.issue.year}/{self.rng.randrange(1000):03d}"
+
+    def explicit(self, deadline: date):
+        self.explicit_deadline = self.expected_deadline = deadline
+        self.deadline_source = 'explicit'
+
+    def inferred(self):
+        """No stated expiry: the deadline is the document date plus the type's renewal period"""
+        self.expected_deadline = self.document_date + timedelta(days=DOCUMENT_PATTERNS[self.document_type]['period'])
+        self.deadline_source = 'inferred'
+
+    def optional(self, line: str, probability: float = 0.5) -> str:
+        return line if self.rng.random() < probability else ''
+
+def _bbbee_clear(d: _Document) -> str:
+    d.document_date = d.issue
+    d.explicit(expiry_after(d.issue, 12))
+    level = d.rng.randint(1, 8)
+    return f"""BROAD-BASED BLACK ECONOMIC EMPOWERMENT CERTIFICATE
+Certificate Number: {d.reference('BEE')}
+Issue Date: {d.fmt(d.issue)}
+
+This certifies that:
+COMPANY: {d.company}
+Registration Number: {d.registration}
+{d.optional(f"VAT Number: 4{d.rng.randrange(10 ** 9):09d}")}
+
+Has been evaluated and certified as a:
+LEVEL {level} B-BBEE CONTRIBUTOR
+
+B-BBEE STATUS: Level {level} Contributor
+TOTAL POINTS SCORED: {d.rng.uniform(40, 110):.2f} points
+BLACK OWNERSHIP: {d.rng.randint(10, 100)}%
+
+This certificate is valid for a period of 12 months from date of issue.
+Expiry Date: {d.fmt(d.explicit_deadline)}
+
+Verification Agency: {d.rng.choice(AGENCIES)}
+"""
+
+def _bbbee_less_explicit(d: _Document) -> str:
+    d.document_date = d.issue
+    d.inferred()
+    return f"""B-BBEE VERIFICATION CERTIFICATE
+Ref: {d.reference('BBBEE')}
+
+VERIFIED ENTITY:
+{d.company}
+Company Reg: {d.registration}
+
+VERIFICATION AND VALIDITY
+Assessment Completion: {d.fmt(d.issue)}
+Certificate Duration: Twelve months from assessment
+Level Achieved: Level {d.rng.randint(1, 8)} Contributor
+
+Element Scores:
+- Ownership: {d.rng.uniform(5, 25):.1f}/25
+- Management Control: {d.rng.randint(5, 19)}/19
+- Skills Development: {d.rng.randint(5, 20)}/20
+
+Verified by: {d.rng.choice(AGENCIES)}
+"""
+
+def _bbbee_minimal(d: _Document) -> str:
+    return f"""B-BBEE STATUS CONFIRMATION
+Document ID: {d.issue.year}/BEE/{d.rng.randrange(1000):03d}
+
+Business: {d.company}
+Registration: {d.registration}
+
+Measured Entity Status: Level {d.rng.randint(1, 8)}
+Procurement Recognition: {d.rng.choice([135, 125, 110, 100, 80])}%
+
+Assessment conducted in accordance with
+Codes of Good Practice on Black Economic Empowerment
+
+Note: Standard validity terms apply to this confirmation.
+"""
+
+def _bbbee_multiple_dates(d: _Document) -> str:
+    d.document_date = d.issue
+    d.inferred()
+    assessed = d.issue - timedelta(days=d.rng.randint(40, 90))
+    reviewed = assessed + timedelta(days=d.rng.randint(5, 20))
+    visited = reviewed + timedelta(days=d.rng.randint(5, 20))
+    return f"""B-BBEE VERIFICATION RECORD
+Certificate Reference: {d.reference('BEE')}
+
+MEASURED ENTITY INFORMATION
+Entity Name: {d.company}
+Registration: {d.registration}
+
+KEY DATES:
+Initial Assessment: {d.fmt(assessed)}
+Documentation Review: {d.fmt(reviewed)}
+Site Visit Completed: {d.fmt(visited)}
+Certificate Generated: {d.fmt(d.issue)}
+
+Verification Outcome: Level {d.rng.randint(1, 8)} B-BBEE Status
+
+Annual verification required in line with Gazette 42496.
+Contact verification agency for renewal requirements.
+"""
+
+def _bbbee_amended(d: _Document) -> str:
+    original = d.issue - timedelta(days=d.rng.randint(30, 200))
+    d.document_date = original
+    d.explicit(expiry_after(original, 12))
+    return f"""AMENDED B-BBEE STATUS VERIFICATION CERTIFICATE
+Original Certificate: {d.reference('BEE')}
+Amendment Reference: AM/{d.issue.year}/{d.rng.randrange(100):02d}
+
+ENTERPRISE DETAILS
+Legal Name: {d.company}
+Registration: {d.registration}
+
+STATUS INFORMATION
+Previous Rating: Level {d.rng.randint(3, 8)} (Original assessment dated {d.fmt(original)})
+Amended Rating: Level {d.rng.randint(1, 2)} (Amendment effective {d.fmt(d.issue)})
+
+This amended certificate supersedes the original certificate and maintains the original validity period.
+Valid Until: {d.fmt(d.explicit_deadline)}
+"""
+
+def _environmental_clear(d: _Document) -> str:
+    months = d.rng.choice([24, 36])
+    d.document_date = d.issue
+    d.explicit(expiry_after(d.issue, months))
+    return f"""ENVIRONMENTAL AUTHORIZATION
+Reference Number: {d.reference('EA')}
+Issued in terms of the National Environmental Management Act (NEMA)
+
+PROJECT DETAILS
+Name: {d.rng.choice(COMPANY_PREFIXES)} {d.rng.choice(['Solar Farm', 'Wind Farm', 'Hydro Scheme'])}
+Location: {d.rng.choice(LOCATIONS)}
+Developer: {d.company}
+
+AUTHORIZATION PERIOD
+Date of Issue: {d.fmt(d.issue)}
+Valid for: {months} months from date of issue
+Expiry Date: {d.fmt(d.explicit_deadline)}
+
+Activities must commence within {months} months of issue date.
+{d.optional("Environmental Management Plan to be reviewed annually.")}
+"""
+
+def _environmental_less_explicit(d: _Document) -> str:
+    months = 24
+    d.document_date = d.issue
+    d.inferred()
+    return f"""ENVIRONMENTAL AUTHORISATION NOTICE
+File Reference: {d.reference('EIA')}
+
+APPLICANT: {d.company}
+SITE: {d.rng.choice(LOCATIONS)}
+
+The environmental impact assessment was concluded and authorization granted on {d.fmt(d.issue)}.
+This authorization remains in force for {NUMBER_WORDS[months].lower()} months thereafter.
+Environmental management programme audits are required every {d.rng.choice([6, 12])} months.
+"""
+
+def _environmental_conditional(d: _Document) -> str:
+    return f"""PROVISIONAL ENVIRONMENTAL AUTHORIZATION
+Reference: {d.reference('PEA')}
+
+PROJECT: {d.rng.choice(['Coastal Wind Farm', 'Inland Solar Park', 'Battery Storage'])} Development
+APPLICANT: {d.company}
+
+CONDITIONAL APPROVAL GRANTED SUBJECT TO:
+1. Completion of {d.rng.choice(['bird migration', 'bat activity', 'groundwater'])} studies
+   - Duration: {d.rng.choice([6, 12, 18])} months
+   - Report submission: Within {d.rng.choice([14, 20])} months
+
+2. {d.rng.choice(['Marine', 'Heritage', 'Wetland'])} impact assessment
+   - Completion deadline: Before construction
+
+3. Public consultation process
+   - Minimum period: {d.rng.choice([3, 6])} months
+
+Final authorization validity subject to completion of conditions.
+Standard bi-annual review applies post-authorization.
+"""
+
+def _environmental_multiple_phases(d: _Document) -> str:
+    d.document_date = d.issue
+    phase_one = add_months(d.issue, d.rng.choice([12, 18]))
+    phase_two = add_months(phase_one, d.rng.choice([12, 24]))
+    d.explicit(add_months(phase_two, 6))
+    return f"""INTEGRATED ENVIRONMENTAL AUTHORIZATION
+Project ID: IEA/{d.issue.year}/Q{(d.issue.month - 1) // 3 + 1}/{d.rng.randrange(1000):03d}
+Authorized on: {d.fmt(d.issue)}
+
+DEVELOPMENT: Greenfield {d.rng.choice(['Solar', 'Wind', 'Storage'])} Installation
+LOCATION: {d.rng.choice(LOCATIONS)}
+HOLDER: {d.company}
+
+AUTHORIZATION SCHEDULE:
+Phase 1 - Site Preparation
+- Complete by: {d.fmt(phase_one)}
+
+Phase 2 - Installation
+- Complete by: {d.fmt(phase_two)}
+
+Phase 3 - Grid Connection
+- Timeline: Subject to Eskom approval
+
+This authorization expires on {d.fmt(d.explicit_deadline)} unless all phases are complete.
+Environmental compliance monitoring required throughout project lifecycle.
+"""
+
+def _safety_clear(d: _Document) -> str:
+    d.document_date = d.issue
+    d.explicit(expiry_after(d.issue, 12))
+    return f"""SAFETY CERTIFICATE
+Certificate No: {d.reference('SC')}
+Issued under the Occupational Health and Safety Act
+
+FACILITY: {d.rng.choice(COMPANY_PREFIXES)} Generation Facility
+OPERATOR: {d.company}
+
+Issue Date: {d.fmt(d.issue)}
+Expiry Date: {d.fmt(d.explicit_deadline)}
+
+Safety inspection completed with no major findings.
+{d.optional("Annual safety management audit required.")}
+"""
+
+def _safety_less_explicit(d: _Document) -> str:
+    d.document_date = d.issue
+    d.inferred()
+    return f"""OCCUPATIONAL HEALTH AND SAFETY COMPLIANCE
+Record: {d.reference('OHS')}
+
+SITE OPERATOR: {d.company}
+LOCATION: {d.rng.choice(LOCATIONS)}
+
+Safety inspection concluded on {d.fmt(d.issue)}.
+This safety certification is valid for twelve months from the inspection date.
+Safety management system reviewed and found compliant.
+"""
+
+def _safety_conditional(d: _Document) -> str:
+    return f"""PROVISIONAL SAFETY COMPLIANCE RECORD
+Record Number: {d.reference('PSCR')}
+
+SITE: {d.rng.choice(COMPANY_PREFIXES)} Generation Facility
+OPERATOR: {d.company}
+
+STATUS: Provisional Approval
+CONDITIONS:
+1. Staff Training Completion
+   - Timeline: Within {d.rng.choice([3, 6])} months
+2. Equipment Calibration
+   - Monthly checks
+3. Safety Protocol Implementation
+   - Review after {d.rng.choice([6, 12])} months
+
+Full safety certification pending completion of conditions.
+Standard safety inspection reviews apply post-certification.
+"""
+
+def _safety_multiple_certs(d: _Document) -> str:
+    d.document_date = d.issue
+    expiries = {
+        'Fire Safety': expiry_after(d.issue, d.rng.choice([12, 24])),
+        'Electrical Safety': expiry_after(d.issue, d.rng.choice([12, 36])),
+        'Working at Heights': expiry_after(d.issue, d.rng.choice([6, 12]))
+    }
+    # The combined certificate lapses with the first of its parts
+    d.explicit(min(expiries.values()))
+    lines = '\n'.join(f"- {name} Certificate: expires {d.fmt(expiry)}" for name, expiry in expiries.items())
+    return f"""COMBINED SAFETY CERTIFICATION SCHEDULE
+Schedule Reference: {d.reference('CSS')}
+Date of Issue: {d.fmt(d.issue)}
+
+OPERATOR: {d.company}
+
+COMPONENT CERTIFICATES:
+{lines}
+
+The combined safety certificate is valid until {d.fmt(d.explicit_deadline)}.
+Occupational health and safety inspections continue quarterly.
+"""
+
+def _safety_system_specific(d: _Document) -> str:
+    d.document_date = d.issue
+    d.explicit(add_months(d.issue, d.rng.choice([6, 12])))
+    return f"""SYSTEM SAFETY CERTIFICATE
+Certificate: {d.reference('SSC')}
+System: {d.rng.choice(SYSTEMS)}
+Owner: {d.company}
+
+Inspection Date: {d.fmt(d.issue)}
+Inspector: {d.rng.choice(['J. Mokoena', 'A. Naidoo', 'P. van Wyk', 'T. Dlamini'])}
+
+Safety certificate for this system only. Fire safety and electrical systems are certified separately.
+Next Inspection Due: {d.fmt(d.explicit_deadline)}
+"""
+
+VARIANTS = {
+    'BBBEE Certificate': {
+        'clear': _bbbee_clear,
+        'less_explicit': _bbbee_less_explicit,
+        'minimal': _bbbee_minimal,
+        'multiple_dates': _bbbee_multiple_dates,
+        'amended': _bbbee_amended
+    },
+    'Environmental Authorization': {
+        'clear': _environmental_clear,
+        'less_explicit': _environmental_less_explicit,
+        'conditional': _environmental_conditional,
+        'multiple_phases': _environmental_multiple_phases
+    },
+    'Safety Certification': {
+        'clear': _safety_clear,
+        'less_explicit': _safety_less_explicit,
+        'conditional': _safety_conditional,
+        'multiple_certs': _safety_multiple_certs,
+        'system_specific': _safety_system_specific
+    }
+}
+TYPE_SLUGS = {'BBBEE Certificate': 'bbbee', 'Environmental Authorization': 'environmental', 'Safety Certification': 'safety'}
+
+def _iso(value: date) -> str:
+    return value.isoformat() if value else None
+
+def generate_document(index: int, seed: int = DEFAULT_SEED) -> dict:
+    """Document index of the corpus for seed: its file name, text and ground-truth labels"""
+    rng = random.Random(f"{seed}:{index}")
+    document_type = rng.choice(list(VARIANTS))
+    variant = rng.choice(list(VARIANTS[document_type]))
+    document = _Document(rng, document_type)
+    # Occasionally drop blank lines so paragraph spacing varies too
+    text = '\n'.join(line for line in VARIANTS[document_type][variant](document).split('\n') if line or rng.random() < 0.9)
+    return {
+        'name': f"{index:08d}-{TYPE_SLUGS[document_type]}-{variant}.txt",
+        'text': text,
+        'labels': {
+            'document_type': document_type,
+            'variant': variant,
+            'explicit_deadline': _iso(document.explicit_deadline),
+            'document_date': _iso(document.document_date),
+            'expected_deadline': _iso(document.expected_deadline),
+            'deadline_source': document.deadline_source
+        }
+    }
+
+def generate(count: int, seed: int = DEFAULT_SEED, start: int = 0):
+    """Yield documents start .. start + count - 1 of the corpus for seed"""
+    for index in range(start, start + count):
+        yield generate_document(index, seed)
+
+def write_corpus(directory: str, count: int, seed: int = DEFAULT_SEED, start: int = 0) -> int:
+    """Write documents as .txt files with their labels appended to labels.jsonl, returning the count written"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(directory / LABELS_FILE, 'a', encoding='utf-8') as labels:
+        for document in generate(count, seed, start):
+            (directory / document['name']).write_text(document['text'], encoding='utf-8')
+            labels.write(json.dumps({'name': document['name'], **document['labels']}) + '\n')
+            written += 1
+    return written
+
+def read_labels(directory: str) -> dict:
+    """Ground-truth labels of a written corpus, by file name"""
+    labels = {}
+    with open(Path(directory) / LABELS_FILE, 'r', encoding='utf-8') as file:
+        for line in file:
+            record = json.loads(line)
+            labels[record.pop('name')] = record
+    return labels
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--count', type=int, required=True, help='Number of documents')
+    parser.add_argument('--output', required=True, help='Directory for the .txt files and labels.jsonl')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--start', type=int, default=0, help='Index of the first document (to extend a corpus)')
+    args = parser.parse_args()
+
+    written = write_corpus(args.output, args.count, args.seed, args.start)
+    print(f"Wrote {written} documents and labels to {args.output}")
+
+if __name__ == "__main__":
+    main()